@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Response Cache for ASHA Connect
+
+This module provides a shared Flask-Caching instance used to cache
+expensive or slow-changing API responses (system info, usage reports)
+for short periods. The cache is bound to the application in app.py
+via cache.init_app(app).
+"""
+
+from flask_caching import Cache
+
+# Simple in-process cache with short TTLs set per endpoint
+cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+orjson JSON Provider for ASHA Connect
+
+This module plugs orjson into Flask's JSON machinery so that every
+jsonify() call serializes through orjson's C implementation instead of
+the standard library, which matters for the larger list and report
+payloads returned by the admin endpoints.
+"""
+
+import orjson
+
+try:
+    # The provider interface exists from Flask 2.2 onwards
+    from flask.json.provider import JSONProvider
+except ImportError:
+    JSONProvider = None
+
+if JSONProvider is not None:
+    class OrJSONProvider(JSONProvider):
+        """Flask JSON provider backed by orjson."""
+
+        def dumps(self, obj, **kwargs):
+            # Non-string keys (e.g. int IDs used as dict keys in report
+            # payloads) serialize the same way the stdlib encoder did;
+            # default=str covers BSON ObjectIds, which the data layer
+            # now returns without a per-document conversion loop
+            return orjson.dumps(
+                obj, option=orjson.OPT_NON_STR_KEYS, default=str
+            ).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+def init_app(app):
+    """Install the orjson provider on a Flask application.
+
+    Args:
+        app: Flask application instance
+
+    On Flask versions without the provider interface this is a no-op
+    and the application keeps the default serializer.
+    """
+    if JSONProvider is not None:
+        app.json = OrJSONProvider(app)
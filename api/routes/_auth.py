@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Shared Authentication Middleware for ASHA Connect
+
+Each route blueprint previously carried its own copy of the
+token_required decorator and constructed its own UserService. This
+module holds the single implementation and the shared service instance
+so the verification cache and database connections exist once per
+process.
+"""
+
+import hmac
+import logging
+import orjson
+from flask import request, jsonify, g, Response
+from functools import wraps
+
+# Import services
+from services.user_service import UserService
+from data.database import get_db
+from api.routes._auth_cache import verify_cached
+
+# Shared service instance used by every blueprint
+user_service = UserService(get_db())
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Denial bodies encoded once - these are the highest-frequency error
+# paths, so they skip dict allocation and JSON encoding entirely
+_ERR_NO_TOKEN_BODY = orjson.dumps({'success': False, 'error': 'Token is missing'})
+_ERR_BAD_TOKEN_BODY = orjson.dumps({'success': False, 'error': 'Invalid token'})
+
+def load_json():
+    """Parse the request JSON body once per request, memoized on g.
+
+    Returns:
+        Decoded JSON body, or None when the request carries none
+    """
+    if not hasattr(g, 'json'):
+        g.json = request.get_json(silent=True)
+    return g.json
+
+# Authentication middleware
+def token_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        # Stacked decorators and blueprint-level hooks can apply this
+        # middleware more than once per request - verify only the first time
+        if getattr(g, '_auth_done', False):
+            return f(*args, **kwargs)
+
+        token = None
+
+        # Get token from Werkzeug's parsed Authorization header, falling
+        # back to manual constant-time parsing on older Werkzeug versions
+        auth = request.authorization
+        if auth is not None and auth.type == 'bearer' and getattr(auth, 'token', None):
+            token = auth.token
+        elif 'Authorization' in request.headers:
+            auth_header = request.headers['Authorization']
+            if len(auth_header) > 7 and hmac.compare_digest(auth_header[:7], 'Bearer '):
+                token = auth_header[7:].strip()
+
+        if not token:
+            return Response(_ERR_NO_TOKEN_BODY, status=401,
+                            mimetype='application/json')
+
+        # Verify token (cached for repeated requests within a short TTL)
+        result = verify_cached(user_service, token)
+
+        if not result['success']:
+            if 'error' in result:
+                return jsonify({
+                    'success': False,
+                    'error': result['error']
+                }), 401
+            return Response(_ERR_BAD_TOKEN_BODY, status=401,
+                            mimetype='application/json')
+
+        # Store user in request context
+        g.user = result['user']
+        g._auth_done = True
+
+        return f(*args, **kwargs)
+
+    return decorated
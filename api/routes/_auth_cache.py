@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Authentication Cache for ASHA Connect
+
+This module provides a short-lived cache for JWT verification results so that
+repeated requests with the same token skip the full cryptographic verification
+path. Entries are keyed by a SHA-256 digest of the token (never the raw token)
+and expire after a few seconds, bounding how long a revoked user could still
+be served from cache.
+
+The cache is opt-in via the AUTH_CACHE_ENABLED environment variable.
+"""
+
+import os
+import hashlib
+import threading
+
+from cachetools import TTLCache
+
+# Cache configuration
+AUTH_CACHE_ENABLED = os.getenv('AUTH_CACHE_ENABLED', 'false').lower() == 'true'
+AUTH_CACHE_MAXSIZE = int(os.getenv('AUTH_CACHE_MAXSIZE', 10000))
+AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', 5))  # seconds
+
+# Bounded TTL cache guarded by a lock for thread safety
+_cache = TTLCache(maxsize=AUTH_CACHE_MAXSIZE, ttl=AUTH_CACHE_TTL)
+_lock = threading.RLock()
+
+def verify_cached(user_service, token):
+    """Verify a JWT token, serving repeated verifications from cache.
+
+    Args:
+        user_service: UserService instance used for actual verification
+        token: JWT token to verify
+
+    Returns:
+        Dict containing verification result and user info if successful
+    """
+    if not AUTH_CACHE_ENABLED:
+        return user_service.get_user_with_context(token)
+
+    # Key by digest so raw tokens are never held in the cache
+    key = hashlib.sha256(token.encode()).digest()
+
+    with _lock:
+        user = _cache.get(key)
+
+    if user is not None:
+        return {
+            'success': True,
+            'user': user
+        }
+
+    # Cache miss - perform full verification with eager relations
+    result = user_service.get_user_with_context(token)
+
+    # Only cache successful verifications
+    if result['success']:
+        with _lock:
+            _cache[key] = result['user']
+
+    return result
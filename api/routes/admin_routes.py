@@ -1,499 +1,596 @@
-#!/usr/bin/env python
-# -*- coding: utf-8 -*-
-
-"""
-Admin Routes for ASHA Connect
-
-This module defines API endpoints for admin-related functionality including:
-- User management
-- System configuration
-- Reporting and analytics
-"""
-
-import os
-import logging
-from flask import Blueprint, request, jsonify, g
-from functools import wraps
-
-# Import services
-from services.user_service import UserService
-from services.sync_service import SyncService
-from data.database import Database
-
-# Create blueprint
-admin_bp = Blueprint('admin', __name__)
-
-# Initialize services
-db = Database()
-user_service = UserService(db)
-sync_service = SyncService(db)
-
-# Configure logging
-logger = logging.getLogger(__name__)
-
-# Authentication middleware from user_routes
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        
-        # Get token from header
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-        
-        if not token:
-            return jsonify({
-                'success': False,
-                'error': 'Token is missing'
-            }), 401
-        
-        # Verify token
-        result = user_service.verify_token(token)
-        
-        if not result['success']:
-            return jsonify({
-                'success': False,
-                'error': result.get('error', 'Invalid token')
-            }), 401
-        
-        # Store user in request context
-        g.user = result['user']
-        
-        return f(*args, **kwargs)
-    
-    return decorated
-
-# Admin permission middleware
-def admin_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        # Check if user is admin
-        if g.user['role'] != 'admin':
-            return jsonify({
-                'success': False,
-                'error': 'Admin privileges required'
-            }), 403
-        
-        return f(*args, **kwargs)
-    
-    return decorated
-
-@admin_bp.route('/users', methods=['GET'])
-@token_required
-@admin_required
-def list_users():
-    """List all users with optional filtering and pagination.
-    
-    Query parameters:
-        - page: Page number (default: 1)
-        - limit: Results per page (default: 20)
-        - role: Filter by role
-        - is_active: Filter by active status
-    
-    Returns:
-        JSON with list of users and pagination info
-    """
-    try:
-        # Get query parameters
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
-        
-        # Build filters
-        filters = {}
-        
-        if 'role' in request.args:
-            filters['role'] = request.args.get('role')
-            
-        if 'is_active' in request.args:
-            filters['is_active'] = request.args.get('is_active').lower() == 'true'
-        
-        # Get users
-        result = user_service.list_users(filters, page, limit)
-        
-        if result['success']:
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 400
-            
-    except Exception as e:
-        logger.error(f"List users error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/users/<user_id>', methods=['GET'])
-@token_required
-@admin_required
-def get_user(user_id):
-    """Get detailed information about a specific user.
-    
-    Args:
-        user_id: ID of the user to retrieve
-    
-    Returns:
-        JSON with user information
-    """
-    try:
-        # Get user
-        result = user_service.get_user(user_id)
-        
-        if result['success']:
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 404
-            
-    except Exception as e:
-        logger.error(f"Get user error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/users', methods=['POST'])
-@token_required
-@admin_required
-def create_user():
-    """Create a new user.
-    
-    Expects:
-        - JSON with user information
-    
-    Returns:
-        JSON with created user information
-    """
-    try:
-        data = request.json
-        
-        if not data:
-            return jsonify({
-                'success': False,
-                'error': 'No data provided'
-            }), 400
-        
-        # Create user
-        result = user_service.create_user(data, g.user['id'])
-        
-        if result['success']:
-            return jsonify(result), 201
-        else:
-            return jsonify(result), 400
-            
-    except Exception as e:
-        logger.error(f"Create user error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/users/<user_id>', methods=['PUT'])
-@token_required
-@admin_required
-def update_user(user_id):
-    """Update an existing user.
-    
-    Args:
-        user_id: ID of the user to update
-    
-    Expects:
-        - JSON with updated user information
-    
-    Returns:
-        JSON with updated user information
-    """
-    try:
-        data = request.json
-        
-        if not data:
-            return jsonify({
-                'success': False,
-                'error': 'No data provided'
-            }), 400
-        
-        # Update user
-        result = user_service.update_user(user_id, data, g.user['id'])
-        
-        if result['success']:
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 400
-            
-    except Exception as e:
-        logger.error(f"Update user error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/users/<user_id>', methods=['DELETE'])
-@token_required
-@admin_required
-def delete_user(user_id):
-    """Delete a user.
-    
-    Args:
-        user_id: ID of the user to delete
-    
-    Returns:
-        JSON with deletion result
-    """
-    try:
-        # Delete user
-        result = user_service.delete_user(user_id, g.user['id'])
-        
-        if result['success']:
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 400
-            
-    except Exception as e:
-        logger.error(f"Delete user error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/sync/status', methods=['GET'])
-@token_required
-@admin_required
-def get_sync_status():
-    """Get the current synchronization status.
-    
-    Returns:
-        JSON with sync status information
-    """
-    try:
-        # Get sync status
-        result = sync_service.get_sync_status()
-        
-        if result['success']:
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 400
-            
-    except Exception as e:
-        logger.error(f"Get sync status error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/sync/trigger', methods=['POST'])
-@token_required
-@admin_required
-def trigger_sync():
-    """Trigger data synchronization.
-    
-    Returns:
-        JSON with sync result
-    """
-    try:
-        # Trigger sync
-        result = sync_service.sync_data(force=True)
-        
-        if result['success']:
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 400
-            
-    except Exception as e:
-        logger.error(f"Trigger sync error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/sync/retry-failed', methods=['POST'])
-@token_required
-@admin_required
-def retry_failed_sync():
-    """Retry failed synchronization items.
-    
-    Returns:
-        JSON with retry result
-    """
-    try:
-        # Retry failed sync
-        result = sync_service.retry_failed_sync()
-        
-        if result['success']:
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 400
-            
-    except Exception as e:
-        logger.error(f"Retry failed sync error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/system/info', methods=['GET'])
-@token_required
-@admin_required
-def get_system_info():
-    """Get system information.
-    
-    Returns:
-        JSON with system information
-    """
-    try:
-        # Get system information
-        import platform
-        import psutil
-        from datetime import datetime
-        
-        # Application info
-        app_info = {
-            'name': os.getenv('APP_NAME', 'ASHA Connect'),
-            'version': os.getenv('APP_VERSION', '1.0.0'),
-            'environment': os.getenv('FLASK_ENV', 'production'),
-            'start_time': datetime.now().isoformat()
-        }
-        
-        # System info
-        system_info = {
-            'platform': platform.platform(),
-            'python_version': platform.python_version(),
-            'cpu_count': psutil.cpu_count(),
-            'memory_total': psutil.virtual_memory().total,
-            'memory_available': psutil.virtual_memory().available
-        }
-        
-        # Database info
-        db_info = {
-            'online': db.is_online(),
-            'type': 'MongoDB' if db.is_online() else 'SQLite (offline)',
-            'connection_string': db.mongo_uri if db.is_online() else db.sqlite_path
-        }
-        
-        return jsonify({
-            'success': True,
-            'app': app_info,
-            'system': system_info,
-            'database': db_info
-        }), 200
-            
-    except Exception as e:
-        logger.error(f"Get system info error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/system/logs', methods=['GET'])
-@token_required
-@admin_required
-def get_logs():
-    """Get application logs.
-    
-    Query parameters:
-        - lines: Number of lines to retrieve (default: 100)
-        - level: Minimum log level (default: 'INFO')
-    
-    Returns:
-        JSON with log entries
-    """
-    try:
-        # Get query parameters
-        lines = int(request.args.get('lines', 100))
-        level = request.args.get('level', 'INFO').upper()
-        
-        # Get log file path
-        log_file = 'logs/app.log'
-        
-        if not os.path.exists(log_file):
-            return jsonify({
-                'success': False,
-                'error': 'Log file not found'
-            }), 404
-        
-        # Read log file
-        with open(log_file, 'r') as f:
-            log_lines = f.readlines()
-        
-        # Filter by level and limit lines
-        log_levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
-        min_level_index = log_levels.index(level) if level in log_levels else 0
-        
-        filtered_logs = []
-        for line in reversed(log_lines):
-            for log_level in log_levels[min_level_index:]:
-                if f' - {log_level} - ' in line:
-                    filtered_logs.append(line.strip())
-                    break
-            
-            if len(filtered_logs) >= lines:
-                break
-        
-        return jsonify({
-            'success': True,
-            'logs': filtered_logs,
-            'count': len(filtered_logs)
-        }), 200
-            
-    except Exception as e:
-        logger.error(f"Get logs error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@admin_bp.route('/reports/usage', methods=['GET'])
-@token_required
-@admin_required
-def get_usage_report():
-    """Get system usage report.
-    
-    Query parameters:
-        - period: Time period (day, week, month) (default: 'week')
-        - start_date: Start date (YYYY-MM-DD) (optional)
-        - end_date: End date (YYYY-MM-DD) (optional)
-    
-    Returns:
-        JSON with usage statistics
-    """
-    try:
-        # Get query parameters
-        period = request.args.get('period', 'week')
-        
-        # In a real implementation, this would query usage data from the database
-        # Simplified implementation for demonstration
-        
-        # Mock usage data
-        usage_data = {
-            'assessments_count': 120,
-            'patients_count': 45,
-            'active_users': 8,
-            'offline_usage_percent': 35,
-            'average_assessment_time': 180,  # seconds
-            'referrals_count': 18,
-            'by_condition': {
-                'malaria': 22,
-                'dengue': 15,
-                'diarrhea': 38,
-                'pneumonia': 25,
-                'anemia': 20
-            },
-            'by_village': {
-                'Rajpur': 35,
-                'Chandpur': 28,
-                'Nayagaon': 42,
-                'Sundarpur': 15
-            }
-        }
-        
-        return jsonify({
-            'success': True,
-            'period': period,
-            'data': usage_data
-        }), 200
-            
-    except Exception as e:
-        logger.error(f"Get usage report error: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Admin Routes for ASHA Connect
+
+This module defines API endpoints for admin-related functionality including:
+- User management
+- System configuration
+- Reporting and analytics
+"""
+
+import os
+import re
+import logging
+import platform
+import psutil
+import uuid
+import orjson
+from flask import Blueprint, request, jsonify, g
+from concurrent.futures import ThreadPoolExecutor
+
+# Import shared auth middleware and services
+from services.sync_service import SyncService
+from data.database import get_db
+from api.routes._auth import token_required, user_service
+from api.routes.health_routes import clear_permission_cache
+from api.cache import cache
+
+# Create blueprint
+admin_bp = Blueprint('admin', __name__)
+
+# Initialize services
+db = get_db()
+sync_service = SyncService(db)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Precompiled log-level matcher for get_logs - a single C-level regex scan
+# per line instead of one substring check per level
+LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+_LOG_LEVEL_RE = re.compile(r' - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - ')
+_LOG_LEVEL_INDEX = {name: index for index, name in enumerate(LOG_LEVELS)}
+
+# Background executor for sync jobs so triggering a sync does not pin
+# an HTTP worker for the duration of the run. Job status lives in the
+# sync service's SQLite database, not in this process, so status polls
+# work no matter which gunicorn worker they land on.
+_executor = ThreadPoolExecutor(max_workers=2)
+
+
+def _run_sync_job(job_id, task):
+    """Run a sync task and persist its result for pollers."""
+    try:
+        result = task()
+    except Exception as e:
+        logger.error(f"Sync job {job_id} failed: {str(e)}")
+        result = {
+            'success': False,
+            'error': str(e)
+        }
+    sync_service.finish_job(job_id, result)
+
+
+def _submit_sync_job(task):
+    """Register a sync job and dispatch it to the background executor.
+
+    Args:
+        task: Zero-argument callable performing the sync work
+
+    Returns:
+        The job ID to poll, or None if the job could not be recorded
+    """
+    job_id = uuid.uuid4().hex
+    record = sync_service.create_job(job_id)
+    if not record['success']:
+        return None
+    _executor.submit(_run_sync_job, job_id, task)
+    return job_id
+
+# Host facts that never change for the lifetime of the process
+_PLATFORM = platform.platform()
+_PYTHON_VERSION = platform.python_version()
+_CPU_COUNT = psutil.cpu_count()
+
+# Admin permission check applied once for the whole blueprint instead of
+# stacking decorators on every route
+@admin_bp.before_request
+@token_required
+def _require_admin():
+    if g.user['role'] != 'admin':
+        return jsonify({
+            'success': False,
+            'error': 'Admin privileges required'
+        }), 403
+
+def _json():
+    """Parse the request body once with orjson.
+
+    Returns:
+        Decoded JSON body, or None when the request has no body
+    """
+    return orjson.loads(request.get_data()) if request.content_length else None
+
+
+@admin_bp.route('/users', methods=['GET'])
+def list_users():
+    """List all users with optional filtering and pagination.
+    
+    Query parameters:
+        - page: Page number (default: 1)
+        - limit: Results per page (default: 20)
+        - role: Filter by role
+        - is_active: Filter by active status
+    
+    Returns:
+        JSON with list of users and pagination info
+    """
+    try:
+        # Get query parameters with a single MultiDict reference
+        args = request.args
+        page = int(args.get('page', 1))
+        limit = int(args.get('limit', 20))
+        role = args.get('role')
+        is_active = args.get('is_active')
+
+        # Build filters from locals
+        filters = {}
+
+        if role is not None:
+            filters['role'] = role
+
+        if is_active is not None:
+            filters['is_active'] = is_active.lower() == 'true'
+
+        # Reuse a client-cached total so pages after the first skip the COUNT
+        cached_total = args.get('cached_total')
+        if cached_total is not None and cached_total.isdigit():
+            skip_count = True
+            cached_total = int(cached_total)
+        else:
+            skip_count = False
+            cached_total = None
+
+        # Get users - without a role filter, fan out one query per role
+        # instead of resolving the role for each user individually
+        if 'role' in filters:
+            result = user_service.list_users(filters, page, limit, skip_count, cached_total)
+        else:
+            result = user_service.list_users_by_role_fanout(filters, page, limit, skip_count, cached_total)
+        
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        logger.error(f"List users error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/users/<user_id>', methods=['GET'])
+def get_user(user_id):
+    """Get detailed information about a specific user.
+    
+    Args:
+        user_id: ID of the user to retrieve
+    
+    Returns:
+        JSON with user information
+    """
+    try:
+        # Get user with relations batched into a single fetch
+        result = user_service.get_user_with_relations(user_id)
+        
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 404
+            
+    except Exception as e:
+        logger.error(f"Get user error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/users', methods=['POST'])
+def create_user():
+    """Create a new user.
+    
+    Expects:
+        - JSON with user information
+    
+    Returns:
+        JSON with created user information
+    """
+    try:
+        data = _json()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided'
+            }), 400
+        
+        # Create user
+        result = user_service.create_user(data, g.user['id'])
+        
+        if result['success']:
+            return jsonify(result), 201
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        logger.error(f"Create user error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/users/<user_id>', methods=['PUT'])
+def update_user(user_id):
+    """Update an existing user.
+    
+    Args:
+        user_id: ID of the user to update
+    
+    Expects:
+        - JSON with updated user information
+    
+    Returns:
+        JSON with updated user information
+    """
+    try:
+        data = _json()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided'
+            }), 400
+        
+        # Update user
+        result = user_service.update_user(user_id, data, g.user['id'])
+
+        if result['success']:
+            # Role or permissions may have changed
+            clear_permission_cache()
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        logger.error(f"Update user error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/users/<user_id>', methods=['DELETE'])
+def delete_user(user_id):
+    """Delete a user.
+    
+    Args:
+        user_id: ID of the user to delete
+    
+    Returns:
+        JSON with deletion result
+    """
+    try:
+        # Delete user
+        result = user_service.delete_user(user_id, g.user['id'])
+
+        if result['success']:
+            # Deactivated users must not retain cached grants
+            clear_permission_cache()
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        logger.error(f"Delete user error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/sync/status', methods=['GET'])
+def get_sync_status():
+    """Get the current synchronization status.
+    
+    Returns:
+        JSON with sync status information
+    """
+    try:
+        # Get sync status
+        result = sync_service.get_sync_status()
+        
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        logger.error(f"Get sync status error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/sync/trigger', methods=['POST'])
+def trigger_sync():
+    """Trigger data synchronization in the background.
+
+    Returns:
+        JSON with the job ID to poll for the result
+    """
+    try:
+        # Dispatch the sync and return immediately
+        job_id = _submit_sync_job(lambda: sync_service.sync_data(force=True))
+        if job_id is None:
+            return jsonify({
+                'success': False,
+                'error': 'Failed to record sync job'
+            }), 500
+
+        return jsonify({
+            'success': True,
+            'job_id': job_id
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Trigger sync error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/sync/retry-failed', methods=['POST'])
+def retry_failed_sync():
+    """Retry failed synchronization items in the background.
+
+    Returns:
+        JSON with the job ID to poll for the result
+    """
+    try:
+        # Dispatch the retry and return immediately
+        job_id = _submit_sync_job(sync_service.retry_failed_sync)
+        if job_id is None:
+            return jsonify({
+                'success': False,
+                'error': 'Failed to record sync job'
+            }), 500
+
+        return jsonify({
+            'success': True,
+            'job_id': job_id
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Retry failed sync error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/sync/jobs/<job_id>', methods=['GET'])
+def get_sync_job(job_id):
+    """Get the status of a background sync job.
+
+    Args:
+        job_id: ID returned by trigger_sync or retry_failed_sync
+
+    Returns:
+        JSON with job status and, once finished, the sync result
+    """
+    try:
+        job = sync_service.get_job(job_id)
+
+        if not job['success']:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
+
+        if job['status'] == 'running':
+            return jsonify({
+                'success': True,
+                'status': 'running'
+            }), 200
+
+        # Completed rows stay until the hourly prune, so repeat polls
+        # and late pollers still get the result
+        return jsonify({
+            'success': True,
+            'status': 'completed',
+            'result': job['result']
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Get sync job error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/system/info', methods=['GET'])
+@cache.cached(timeout=15)
+def get_system_info():
+    """Get system information.
+    
+    Returns:
+        JSON with system information
+    """
+    try:
+        # Get system information
+        from datetime import datetime
+
+        # Application info
+        app_info = {
+            'name': os.getenv('APP_NAME', 'ASHA Connect'),
+            'version': os.getenv('APP_VERSION', '1.0.0'),
+            'environment': os.getenv('FLASK_ENV', 'production'),
+            'start_time': datetime.now().isoformat()
+        }
+        
+        # System info - only memory usage changes at runtime, the rest is
+        # captured once at import
+        memory = psutil.virtual_memory()
+        system_info = {
+            'platform': _PLATFORM,
+            'python_version': _PYTHON_VERSION,
+            'cpu_count': _CPU_COUNT,
+            'memory_total': memory.total,
+            'memory_available': memory.available
+        }
+        
+        # Database info - probe connectivity once instead of per field
+        online = db.is_online()
+        db_info = {
+            'online': online,
+            'type': 'MongoDB' if online else 'SQLite (offline)',
+            'connection_string': db.mongo_uri if online else db.sqlite_path
+        }
+        
+        return jsonify({
+            'success': True,
+            'app': app_info,
+            'system': system_info,
+            'database': db_info
+        }), 200
+            
+    except Exception as e:
+        logger.error(f"Get system info error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/system/logs', methods=['GET'])
+def get_logs():
+    """Get application logs.
+    
+    Query parameters:
+        - lines: Number of lines to retrieve (default: 100)
+        - level: Minimum log level (default: 'INFO')
+    
+    Returns:
+        JSON with log entries
+    """
+    try:
+        # Get query parameters
+        lines = int(request.args.get('lines', 100))
+        level = request.args.get('level', 'INFO').upper()
+        
+        # Get log file path
+        log_file = 'logs/app.log'
+        
+        if not os.path.exists(log_file):
+            return jsonify({
+                'success': False,
+                'error': 'Log file not found'
+            }), 404
+        
+        # Filter by level
+        min_level_index = _LOG_LEVEL_INDEX.get(level, 0)
+
+        # Read the log file backwards in fixed-size chunks instead of
+        # loading the whole file, stopping once enough lines have matched
+        filtered_logs = []
+        chunk_size = 65536
+
+        with open(log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            remainder = b''
+
+            while pos > 0 and len(filtered_logs) < lines:
+                read_size = min(chunk_size, pos)
+                pos -= read_size
+                f.seek(pos)
+                chunk = f.read(read_size) + remainder
+
+                chunk_lines = chunk.split(b'\n')
+
+                # The first piece may be a partial line; carry it into the next chunk
+                if pos > 0:
+                    remainder = chunk_lines[0]
+                    chunk_lines = chunk_lines[1:]
+                else:
+                    remainder = b''
+
+                for raw_line in reversed(chunk_lines):
+                    if not raw_line:
+                        continue
+
+                    line = raw_line.decode('utf-8', errors='replace')
+                    match = _LOG_LEVEL_RE.search(line)
+                    if match and _LOG_LEVEL_INDEX[match.group(1)] >= min_level_index:
+                        filtered_logs.append(line.strip())
+
+                    if len(filtered_logs) >= lines:
+                        break
+        
+        return jsonify({
+            'success': True,
+            'logs': filtered_logs,
+            'count': len(filtered_logs)
+        }), 200
+            
+    except Exception as e:
+        logger.error(f"Get logs error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/reports/usage', methods=['GET'])
+@cache.cached(timeout=60, query_string=True)
+def get_usage_report():
+    """Get system usage report.
+    
+    Query parameters:
+        - period: Time period (day, week, month) (default: 'week')
+        - start_date: Start date (YYYY-MM-DD) (optional)
+        - end_date: End date (YYYY-MM-DD) (optional)
+    
+    Returns:
+        JSON with usage statistics
+    """
+    try:
+        # Get query parameters
+        period = request.args.get('period', 'week')
+        
+        # In a real implementation, this would query usage data from the database
+        # Simplified implementation for demonstration
+        
+        # Mock usage data
+        usage_data = {
+            'assessments_count': 120,
+            'patients_count': 45,
+            'active_users': 8,
+            'offline_usage_percent': 35,
+            'average_assessment_time': 180,  # seconds
+            'referrals_count': 18,
+            'by_condition': {
+                'malaria': 22,
+                'dengue': 15,
+                'diarrhea': 38,
+                'pneumonia': 25,
+                'anemia': 20
+            },
+            'by_village': {
+                'Rajpur': 35,
+                'Chandpur': 28,
+                'Nayagaon': 42,
+                'Sundarpur': 15
+            }
+        }
+        
+        return jsonify({
+            'success': True,
+            'period': period,
+            'data': usage_data
+        }), 200
+            
+    except Exception as e:
+        logger.error(f"Get usage report error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
         }), 500
\ No newline at end of file
@@ -1,722 +1,1692 @@
-#!/usr/bin/env python
-# -*- coding: utf-8 -*-
-
-"""
-Database Module for ASHA Connect
-
-This module handles database connections and provides a unified interface
-for data access across the application. It supports both MongoDB for cloud
-storage and SQLite for local offline storage.
-"""
-
-import os
-import logging
-import json
-from typing import Dict, List, Optional, Any, Union
-
-# MongoDB connection
-try:
-    from pymongo import MongoClient
-    from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
-    MONGODB_AVAILABLE = True
-except ImportError:
-    MONGODB_AVAILABLE = False
-
-# SQLite for offline storage
-import sqlite3
-from datetime import datetime
-
-class Database:
-    """Database connection and management for ASHA Connect."""
-    
-    def __init__(self):
-        """Initialize database connections."""
-        self.logger = logging.getLogger(__name__)
-        self.logger.info("Initializing Database Connection")
-        
-        # MongoDB connection settings
-        self.mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/asha_connect')
-        self.db_name = os.getenv('DB_NAME', 'asha_connect')
-        
-        # Local SQLite database for offline mode
-        self.sqlite_path = os.getenv('SQLITE_PATH', 'data/local.db')
-        
-        # Initialize connections
-        self.mongo_client = None
-        self.mongo_db = None
-        self.is_connected = False
-        
-        # Try to connect to MongoDB
-        if MONGODB_AVAILABLE:
-            self._connect_mongodb()
-        else:
-            self.logger.warning("MongoDB driver not available. Running in offline mode only.")
-        
-        # Initialize SQLite database
-        self._init_sqlite()
-        
-        self.logger.info("Database initialization complete")
-    
-    def _connect_mongodb(self) -> bool:
-        """Connect to MongoDB server.
-        
-        Returns:
-            Boolean indicating connection success
-        """
-        try:
-            self.logger.info(f"Connecting to MongoDB at {self.mongo_uri}")
-            self.mongo_client = MongoClient(self.mongo_uri, serverSelectionTimeoutMS=5000)
-            
-            # Verify connection
-            self.mongo_client.admin.command('ping')
-            
-            self.mongo_db = self.mongo_client[self.db_name]
-            self.is_connected = True
-            self.logger.info("Successfully connected to MongoDB")
-            return True
-            
-        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-            self.logger.warning(f"Failed to connect to MongoDB: {str(e)}")
-            self.is_connected = False
-            return False
-        except Exception as e:
-            self.logger.error(f"Unexpected error connecting to MongoDB: {str(e)}")
-            self.is_connected = False
-            return False
-    
-    def _init_sqlite(self) -> None:
-        """Initialize SQLite database for offline storage."""
-        try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.sqlite_path), exist_ok=True)
-            
-            conn = sqlite3.connect(self.sqlite_path)
-            cursor = conn.cursor()
-            
-            # Create tables for core data types
-            
-            # Users table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id TEXT PRIMARY KEY,
-                    username TEXT UNIQUE NOT NULL,
-                    password TEXT NOT NULL,
-                    salt TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    phone TEXT NOT NULL,
-                    email TEXT,
-                    location TEXT,
-                    created_at TEXT NOT NULL,
-                    created_by TEXT,
-                    updated_at TEXT,
-                    updated_by TEXT,
-                    last_login TEXT,
-                    is_active INTEGER NOT NULL DEFAULT 1,
-                    sync_status TEXT DEFAULT 'pending'
-                )
-            """)
-            
-            # Patients table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS patients (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    age INTEGER,
-                    gender TEXT,
-                    phone TEXT,
-                    address TEXT,
-                    village TEXT,
-                    district TEXT,
-                    state TEXT,
-                    medical_history TEXT,
-                    created_at TEXT NOT NULL,
-                    created_by TEXT NOT NULL,
-                    updated_at TEXT,
-                    updated_by TEXT,
-                    is_active INTEGER NOT NULL DEFAULT 1,
-                    sync_status TEXT DEFAULT 'pending'
-                )
-            """)
-            
-            # Health assessments table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS health_assessments (
-                    id TEXT PRIMARY KEY,
-                    patient_id TEXT NOT NULL,
-                    symptoms TEXT NOT NULL,
-                    assessment TEXT NOT NULL,
-                    recommendations TEXT,
-                    referral TEXT,
-                    created_at TEXT NOT NULL,
-                    created_by TEXT NOT NULL,
-                    updated_at TEXT,
-                    updated_by TEXT,
-                    sync_status TEXT DEFAULT 'pending',
-                    FOREIGN KEY (patient_id) REFERENCES patients (id)
-                )
-            """)
-            
-            # Create indexes
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_patients_village ON patients (village)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_assessments_patient ON health_assessments (patient_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_status ON health_assessments (sync_status)")
-            
-            conn.commit()
-            conn.close()
-            
-            self.logger.info("SQLite database initialized successfully")
-            
-        except Exception as e:
-            self.logger.error(f"Error initializing SQLite database: {str(e)}")
-            raise
-    
-    def is_online(self) -> bool:
-        """Check if database is in online mode (connected to MongoDB).
-        
-        Returns:
-            Boolean indicating online status
-        """
-        if not self.is_connected and MONGODB_AVAILABLE:
-            # Try to reconnect if previously disconnected
-            self._connect_mongodb()
-        return self.is_connected
-    
-    def insert_one(self, collection: str, document: Dict) -> Dict:
-        """Insert a single document into the specified collection.
-        
-        Args:
-            collection: Collection name
-            document: Document to insert
-            
-        Returns:
-            Dict containing operation result
-        """
-        try:
-            # Add timestamps
-            if 'created_at' not in document:
-                document['created_at'] = datetime.now().isoformat()
-            
-            # Try MongoDB if online
-            if self.is_online():
-                result = self.mongo_db[collection].insert_one(document)
-                return {
-                    'success': True,
-                    'id': str(result.inserted_id),
-                    'online': True
-                }
-            
-            # Fall back to SQLite
-            return self._sqlite_insert(collection, document)
-            
-        except Exception as e:
-            self.logger.error(f"Error inserting document into {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def find_one(self, collection: str, query: Dict) -> Dict:
-        """Find a single document matching the query.
-        
-        Args:
-            collection: Collection name
-            query: Query criteria
-            
-        Returns:
-            Dict containing operation result and document if found
-        """
-        try:
-            # Try MongoDB if online
-            if self.is_online():
-                document = self.mongo_db[collection].find_one(query)
-                if document:
-                    # Convert ObjectId to string
-                    document['_id'] = str(document['_id'])
-                    return {
-                        'success': True,
-                        'document': document,
-                        'online': True
-                    }
-            
-            # Fall back to SQLite
-            return self._sqlite_find_one(collection, query)
-            
-        except Exception as e:
-            self.logger.error(f"Error finding document in {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def find_many(self, collection: str, query: Dict, limit: int = 100, skip: int = 0, sort: List = None) -> Dict:
-        """Find multiple documents matching the query.
-        
-        Args:
-            collection: Collection name
-            query: Query criteria
-            limit: Maximum number of results
-            skip: Number of results to skip
-            sort: List of (field, direction) tuples for sorting
-            
-        Returns:
-            Dict containing operation result and documents if found
-        """
-        try:
-            # Try MongoDB if online
-            if self.is_online():
-                cursor = self.mongo_db[collection].find(query).skip(skip).limit(limit)
-                
-                if sort:
-                    cursor = cursor.sort(sort)
-                
-                documents = list(cursor)
-                
-                # Convert ObjectId to string
-                for doc in documents:
-                    doc['_id'] = str(doc['_id'])
-                
-                return {
-                    'success': True,
-                    'documents': documents,
-                    'count': len(documents),
-                    'online': True
-                }
-            
-            # Fall back to SQLite
-            return self._sqlite_find_many(collection, query, limit, skip, sort)
-            
-        except Exception as e:
-            self.logger.error(f"Error finding documents in {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def update_one(self, collection: str, query: Dict, update: Dict) -> Dict:
-        """Update a single document matching the query.
-        
-        Args:
-            collection: Collection name
-            query: Query criteria
-            update: Update operations
-            
-        Returns:
-            Dict containing operation result
-        """
-        try:
-            # Add update timestamp
-            if '$set' in update:
-                update['$set']['updated_at'] = datetime.now().isoformat()
-            else:
-                update['$set'] = {'updated_at': datetime.now().isoformat()}
-            
-            # Try MongoDB if online
-            if self.is_online():
-                result = self.mongo_db[collection].update_one(query, update)
-                return {
-                    'success': True,
-                    'matched_count': result.matched_count,
-                    'modified_count': result.modified_count,
-                    'online': True
-                }
-            
-            # Fall back to SQLite
-            return self._sqlite_update(collection, query, update)
-            
-        except Exception as e:
-            self.logger.error(f"Error updating document in {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def delete_one(self, collection: str, query: Dict) -> Dict:
-        """Delete a single document matching the query.
-        
-        Args:
-            collection: Collection name
-            query: Query criteria
-            
-        Returns:
-            Dict containing operation result
-        """
-        try:
-            # Try MongoDB if online
-            if self.is_online():
-                result = self.mongo_db[collection].delete_one(query)
-                return {
-                    'success': True,
-                    'deleted_count': result.deleted_count,
-                    'online': True
-                }
-            
-            # Fall back to SQLite
-            return self._sqlite_delete(collection, query)
-            
-        except Exception as e:
-            self.logger.error(f"Error deleting document from {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def _sqlite_insert(self, collection: str, document: Dict) -> Dict:
-        """Insert a document into SQLite.
-        
-        Args:
-            collection: Table name
-            document: Document to insert
-            
-        Returns:
-            Dict containing operation result
-        """
-        try:
-            conn = sqlite3.connect(self.sqlite_path)
-            cursor = conn.cursor()
-            
-            # Ensure ID exists
-            if '_id' not in document and 'id' not in document:
-                document['id'] = str(datetime.now().timestamp())
-            elif '_id' in document and 'id' not in document:
-                document['id'] = document['_id']
-                del document['_id']
-            
-            # Convert document to JSON for storage
-            document_json = json.dumps(document)
-            
-            # Special handling for core tables
-            if collection in ['users', 'patients', 'health_assessments']:
-                # Extract fields and insert into structured table
-                fields = ', '.join(document.keys())
-                placeholders = ', '.join(['?'] * len(document))
-                values = list(document.values())
-                
-                query = f"INSERT OR REPLACE INTO {collection} ({fields}) VALUES ({placeholders})"
-                cursor.execute(query, values)
-            else:
-                # For other collections, use a generic approach with JSON storage
-                cursor.execute(
-                    f"CREATE TABLE IF NOT EXISTS {collection} (id TEXT PRIMARY KEY, data TEXT, sync_status TEXT)"
-                )
-                cursor.execute(
-                    f"INSERT OR REPLACE INTO {collection} (id, data, sync_status) VALUES (?, ?, ?)",
-                    (document['id'], document_json, 'pending')
-                )
-            
-            conn.commit()
-            conn.close()
-            
-            return {
-                'success': True,
-                'id': document['id'],
-                'online': False
-            }
-            
-        except Exception as e:
-            self.logger.error(f"SQLite insert error for {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def _sqlite_find_one(self, collection: str, query: Dict) -> Dict:
-        """Find a single document in SQLite.
-        
-        Args:
-            collection: Table name
-            query: Query criteria
-            
-        Returns:
-            Dict containing operation result and document if found
-        """
-        try:
-            conn = sqlite3.connect(self.sqlite_path)
-            conn.row_factory = sqlite3.Row  # Enable row factory for named columns
-            cursor = conn.cursor()
-            
-            # Special handling for core tables
-            if collection in ['users', 'patients', 'health_assessments']:
-                # Build WHERE clause from query
-                where_clauses = []
-                params = []
-                
-                for key, value in query.items():
-                    where_clauses.append(f"{key} = ?")
-                    params.append(value)
-                
-                where_clause = " AND ".join(where_clauses) if where_clauses else "1=1"
-                
-                cursor.execute(f"SELECT * FROM {collection} WHERE {where_clause} LIMIT 1", params)
-                row = cursor.fetchone()
-                
-                if row:
-                    # Convert row to dict
-                    document = {key: row[key] for key in row.keys()}
-                    conn.close()
-                    return {
-                        'success': True,
-                        'document': document,
-                        'online': False
-                    }
-            else:
-                # For other collections, use generic approach with JSON storage
-                # Simplified query - only supports querying by ID
-                if 'id' in query or '_id' in query:
-                    id_value = query.get('id', query.get('_id'))
-                    cursor.execute(f"SELECT data FROM {collection} WHERE id = ?", (id_value,))
-                    row = cursor.fetchone()
-                    
-                    if row:
-                        document = json.loads(row[0])
-                        conn.close()
-                        return {
-                            'success': True,
-                            'document': document,
-                            'online': False
-                        }
-            
-            conn.close()
-            return {
-                'success': True,
-                'document': None,
-                'online': False
-            }
-            
-        except Exception as e:
-            self.logger.error(f"SQLite find_one error for {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def _sqlite_find_many(self, collection: str, query: Dict, limit: int, skip: int, sort: List) -> Dict:
-        """Find multiple documents in SQLite.
-        
-        Args:
-            collection: Table name
-            query: Query criteria
-            limit: Maximum number of results
-            skip: Number of results to skip
-            sort: List of (field, direction) tuples for sorting
-            
-        Returns:
-            Dict containing operation result and documents if found
-        """
-        try:
-            conn = sqlite3.connect(self.sqlite_path)
-            conn.row_factory = sqlite3.Row  # Enable row factory for named columns
-            cursor = conn.cursor()
-            
-            # Special handling for core tables
-            if collection in ['users', 'patients', 'health_assessments']:
-                # Build WHERE clause from query
-                where_clauses = []
-                params = []
-                
-                for key, value in query.items():
-                    where_clauses.append(f"{key} = ?")
-                    params.append(value)
-                
-                where_clause = " AND ".join(where_clauses) if where_clauses else "1=1"
-                
-                # Build ORDER BY clause from sort
-                order_clause = ""
-                if sort:
-                    order_terms = []
-                    for field, direction in sort:
-                        direction_str = "ASC" if direction == 1 else "DESC"
-                        order_terms.append(f"{field} {direction_str}")
-                    order_clause = f"ORDER BY {', '.join(order_terms)}"
-                
-                query_str = f"SELECT * FROM {collection} WHERE {where_clause} {order_clause} LIMIT {limit} OFFSET {skip}"
-                cursor.execute(query_str, params)
-                
-                rows = cursor.fetchall()
-                documents = [{key: row[key] for key in row.keys()} for row in rows]
-                
-                conn.close()
-                return {
-                    'success': True,
-                    'documents': documents,
-                    'count': len(documents),
-                    'online': False
-                }
-            else:
-                # For other collections, use generic approach with JSON storage
-                # Note: This is a simplified implementation with limited query support
-                cursor.execute(f"SELECT data FROM {collection} LIMIT {limit} OFFSET {skip}")
-                
-                rows = cursor.fetchall()
-                documents = [json.loads(row[0]) for row in rows]
-                
-                conn.close()
-                return {
-                    'success': True,
-                    'documents': documents,
-                    'count': len(documents),
-                    'online': False
-                }
-            
-        except Exception as e:
-            self.logger.error(f"SQLite find_many error for {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def _sqlite_update(self, collection: str, query: Dict, update: Dict) -> Dict:
-        """Update a document in SQLite.
-        
-        Args:
-            collection: Table name
-            query: Query criteria
-            update: Update operations
-            
-        Returns:
-            Dict containing operation result
-        """
-        try:
-            conn = sqlite3.connect(self.sqlite_path)
-            cursor = conn.cursor()
-            
-            # Special handling for core tables
-            if collection in ['users', 'patients', 'health_assessments']:
-                # Extract $set operations
-                if '$set' not in update:
-                    return {
-                        'success': False,
-                        'error': "Only $set operations are supported in SQLite"
-                    }
-                
-                set_values = update['$set']
-                
-                # Build SET clause
-                set_clauses = []
-                set_params = []
-                
-                for key, value in set_values.items():
-                    set_clauses.append(f"{key} = ?")
-                    set_params.append(value)
-                
-                set_clause = ", ".join(set_clauses)
-                
-                # Build WHERE clause
-                where_clauses = []
-                where_params = []
-                
-                for key, value in query.items():
-                    where_clauses.append(f"{key} = ?")
-                    where_params.append(value)
-                
-                where_clause = " AND ".join(where_clauses)
-                
-                # Execute update
-                cursor.execute(
-                    f"UPDATE {collection} SET {set_clause} WHERE {where_clause}",
-                    set_params + where_params
-                )
-                
-                modified_count = cursor.rowcount
-                conn.commit()
-                conn.close()
-                
-                return {
-                    'success': True,
-                    'matched_count': modified_count,
-                    'modified_count': modified_count,
-                    'online': False
-                }
-            else:
-                # For other collections, use generic approach with JSON storage
-                # Simplified implementation - only supports updating by ID
-                if 'id' in query or '_id' in query:
-                    id_value = query.get('id', query.get('_id'))
-                    
-                    # Get current document
-                    cursor.execute(f"SELECT data FROM {collection} WHERE id = ?", (id_value,))
-                    row = cursor.fetchone()
-                    
-                    if row:
-                        # Update document
-                        document = json.loads(row[0])
-                        
-                        if '$set' in update:
-                            for key, value in update['$set'].items():
-                                document[key] = value
-                        
-                        # Save updated document
-                        cursor.execute(
-                            f"UPDATE {collection} SET data = ?, sync_status = ? WHERE id = ?",
-                            (json.dumps(document), 'pending', id_value)
-                        )
-                        
-                        modified_count = cursor.rowcount
-                        conn.commit()
-                        conn.close()
-                        
-                        return {
-                            'success': True,
-                            'matched_count': modified_count,
-                            'modified_count': modified_count,
-                            'online': False
-                        }
-                
-                conn.close()
-                return {
-                    'success': True,
-                    'matched_count': 0,
-                    'modified_count': 0,
-                    'online': False
-                }
-            
-        except Exception as e:
-            self.logger.error(f"SQLite update error for {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def _sqlite_delete(self, collection: str, query: Dict) -> Dict:
-        """Delete a document from SQLite.
-        
-        Args:
-            collection: Table name
-            query: Query criteria
-            
-        Returns:
-            Dict containing operation result
-        """
-        try:
-            conn = sqlite3.connect(self.sqlite_path)
-            cursor = conn.cursor()
-            
-            # Build WHERE clause
-            where_clauses = []
-            params = []
-            
-            for key, value in query.items():
-                where_clauses.append(f"{key} = ?")
-                params.append(value)
-            
-            where_clause = " AND ".join(where_clauses)
-            
-            # Execute delete
-            cursor.execute(f"DELETE FROM {collection} WHERE {where_clause}", params)
-            
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
-            
-            return {
-                'success': True,
-                'deleted_count': deleted_count,
-                'online': False
-            }
-            
-        except Exception as e:
-            self.logger.error(f"SQLite delete error for {collection}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Database Module for ASHA Connect
+
+This module handles database connections and provides a unified interface
+for data access across the application. It supports both MongoDB for cloud
+storage and SQLite for local offline storage.
+"""
+
+import os
+import atexit
+import copy
+import logging
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Union
+
+from cachetools import TTLCache
+
+# MongoDB connection
+try:
+    from pymongo import MongoClient, ReturnDocument, UpdateOne
+    from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+    from pymongo.monitoring import ConnectionPoolListener
+    from pymongo.write_concern import WriteConcern
+    from bson.codec_options import CodecOptions, TypeRegistry
+    MONGODB_AVAILABLE = True
+except ImportError:
+    MONGODB_AVAILABLE = False
+
+# SQLite for offline storage
+import sqlite3
+from datetime import datetime
+
+# orjson handles the generic JSON column several times faster than the
+# stdlib encoder; fall back when it is not installed
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+    
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# Timestamps are stored as integer epoch microseconds: a fraction of
+# the size of ISO text in rows and index keys, numerically monotonic
+# for ORDER BY, and cheaper to compare than a 27-byte memcmp. Callers
+# that need ISO text convert on read with us_to_iso.
+_TIMESTAMP_FIELDS = ('created_at', 'updated_at', 'last_login')
+
+def _now_us() -> int:
+    """Current time as integer epoch microseconds.
+
+    Returns:
+        Microseconds since the epoch
+    """
+    return time.time_ns() // 1000
+
+def iso_to_us(value: str) -> int:
+    """Convert an ISO-8601 timestamp to epoch microseconds.
+
+    Args:
+        value: ISO-8601 formatted timestamp
+
+    Returns:
+        Microseconds since the epoch
+    """
+    return int(datetime.fromisoformat(value).timestamp() * 1_000_000)
+
+def us_to_iso(value: int) -> str:
+    """Convert epoch microseconds back to an ISO-8601 timestamp.
+
+    Args:
+        value: Microseconds since the epoch
+
+    Returns:
+        ISO-8601 formatted timestamp
+    """
+    return datetime.fromtimestamp(value / 1_000_000).isoformat()
+
+def _normalize_timestamps(fields: Dict) -> None:
+    """Convert any ISO timestamp strings in known fields to microseconds.
+
+    Args:
+        fields: Document or $set mapping, updated in place
+    """
+    for field in _TIMESTAMP_FIELDS:
+        value = fields.get(field)
+        if isinstance(value, str):
+            try:
+                fields[field] = iso_to_us(value)
+            except ValueError:
+                pass
+
+# Shared Database instance - every module should use get_db() so the
+# application holds a single set of connection pools
+_db_instance = None
+
+if MONGODB_AVAILABLE:
+    class _PoolSaturationListener(ConnectionPoolListener):
+        """Track checked-out connections and warn on sustained saturation.
+
+        Keeps a live gauge of in-use connections against the configured
+        pool ceiling; when more than 80% of the pool stays checked out
+        for over 30 seconds, operators get one warning per episode
+        instead of a silent stall in the wait queue.
+        """
+
+        def __init__(self, max_pool_size: int):
+            self.max_pool_size = max_pool_size
+            self.checked_out = 0
+            self._lock = threading.Lock()
+            self._over_since = None
+            self._warned = False
+            self.logger = logging.getLogger(__name__)
+
+        def _track(self, delta: int) -> None:
+            with self._lock:
+                self.checked_out += delta
+                saturated = self.checked_out > 0.8 * self.max_pool_size
+                now = time.monotonic()
+                if not saturated:
+                    self._over_since = None
+                    self._warned = False
+                elif self._over_since is None:
+                    self._over_since = now
+                elif not self._warned and now - self._over_since > 30:
+                    self._warned = True
+                    self.logger.warning(
+                        f"MongoDB pool saturated: {self.checked_out}/"
+                        f"{self.max_pool_size} connections in use for >30s"
+                    )
+
+        def connection_checked_out(self, event):
+            self._track(1)
+
+        def connection_checked_in(self, event):
+            self._track(-1)
+
+        def pool_created(self, event):
+            pass
+
+        def pool_ready(self, event):
+            pass
+
+        def pool_cleared(self, event):
+            pass
+
+        def pool_closed(self, event):
+            pass
+
+        def connection_created(self, event):
+            pass
+
+        def connection_ready(self, event):
+            pass
+
+        def connection_closed(self, event):
+            pass
+
+        def connection_check_out_started(self, event):
+            pass
+
+        def connection_check_out_failed(self, event):
+            pass
+
+
+def get_db() -> 'Database':
+    """Get the shared Database instance, creating it on first use.
+
+    Returns:
+        The process-wide Database instance
+    """
+    global _db_instance
+    if _db_instance is None:
+        _db_instance = Database()
+    return _db_instance
+
+class Database:
+    """Database connection and management for ASHA Connect."""
+    
+    def __init__(self):
+        """Initialize database connections."""
+        self.logger = logging.getLogger(__name__)
+        self.logger.info("Initializing Database Connection")
+        
+        # MongoDB connection settings
+        self.mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/asha_connect')
+        self.db_name = os.getenv('DB_NAME', 'asha_connect')
+        
+        # Local SQLite database for offline mode
+        self.sqlite_path = os.getenv('SQLITE_PATH', 'data/local.db')
+        
+        # Initialize connections
+        self.mongo_client = None
+        self.mongo_db = None
+        self.is_connected = False
+        
+        # Back off between reconnect attempts so an outage costs one
+        # serverSelection timeout per cooldown window, not one per request
+        self._last_mongo_fail = 0.0
+        self._reconnect_cooldown = 30.0
+        
+        # How often the background monitor checks MongoDB health
+        self._monitor_interval = 10.0
+        
+        # One SQLite connection per worker thread - sqlite3 connections
+        # cannot be shared across threads, and opening a fresh one per
+        # operation thrashes the filesystem
+        self._local = threading.local()
+        
+        # Compiled SQL keyed by (op, collection, column shape) so repeat
+        # operations reuse the same statement text and SQLite's per
+        # connection statement cache can skip re-preparing it
+        self._stmt_cache = {}
+        self._generic_tables = set()
+        self._generic_columns = set()
+        
+        # Read results cached briefly so hot lookups (user by username,
+        # patient by id) skip the database entirely; writes invalidate
+        # the collection and the TTL bounds staleness from other writers
+        self._query_cache = TTLCache(maxsize=1024, ttl=30)
+        self._query_cache_lock = threading.Lock()
+        
+        # With auto-checkpointing effectively deferred by WAL+NORMAL,
+        # truncate the WAL and refresh planner stats every N writes so
+        # the log stays bounded and reads keep their locality
+        self._write_count = 0
+        self._wal_interval = 5000
+        
+        self._open_connections = []
+        self._open_connections_lock = threading.Lock()
+        atexit.register(self.close_connections)
+        
+        # Try to connect to MongoDB
+        if MONGODB_AVAILABLE:
+            self._connect_mongodb()
+            self._start_health_monitor()
+        else:
+            self.logger.warning("MongoDB driver not available. Running in offline mode only.")
+        
+        # Initialize SQLite database
+        self._init_sqlite()
+        
+        # Specialize the single-document insert for each core table
+        self._build_insert_specializations()
+        
+        self.logger.info("Database initialization complete")
+    
+    def _connect_mongodb(self) -> bool:
+        """Connect to MongoDB server.
+        
+        Returns:
+            Boolean indicating connection success
+        """
+        try:
+            self.logger.info(f"Connecting to MongoDB at {self.mongo_uri}")
+            # Size the pool for concurrent workers and compress traffic;
+            # retryWrites keeps transient failovers transparent. Pool
+            # bounds come from the environment so deployments can tune
+            # for the ASHA workload (many small reads, occasional bulk
+            # sync); the listener surfaces sustained saturation.
+            max_pool_size = int(os.getenv('MONGO_MAX_POOL_SIZE', 200))
+            self._pool_listener = _PoolSaturationListener(max_pool_size)
+            self.mongo_client = MongoClient(
+                self.mongo_uri,
+                serverSelectionTimeoutMS=5000,
+                maxPoolSize=max_pool_size,
+                minPoolSize=int(os.getenv('MONGO_MIN_POOL_SIZE', 20)),
+                waitQueueTimeoutMS=int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2500)),
+                maxIdleTimeMS=60000,
+                compressors='zstd,snappy',
+                retryWrites=True,
+                event_listeners=[self._pool_listener]
+            )
+            
+            # Verify connection
+            self.mongo_client.admin.command('ping')
+            
+            # Stringify types the BSON encoder does not know natively
+            # (UUIDs, Decimals) in C rather than per-document in Python.
+            #
+            # document_class=RawBSONDocument was considered here to defer
+            # BSON decoding, but the model hydrators read every field of
+            # each document they touch, so the lazy wrapper would pay the
+            # full decode anyway while also keeping the raw buffer alive;
+            # and pass-through API responses go straight to orjson, which
+            # only accepts plain dicts. Decoded dicts stay the interchange
+            # format.
+            self.mongo_db = self.mongo_client.get_database(
+                self.db_name,
+                codec_options=CodecOptions(type_registry=TypeRegistry(fallback_encoder=str))
+            )
+            self.is_connected = True
+            self._ensure_mongo_indexes()
+            self.logger.info("Successfully connected to MongoDB")
+            return True
+            
+        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+            self.logger.warning(f"Failed to connect to MongoDB: {str(e)}")
+            self.is_connected = False
+            self._last_mongo_fail = time.monotonic()
+            return False
+        except Exception as e:
+            self.logger.error(f"Unexpected error connecting to MongoDB: {str(e)}")
+            self.is_connected = False
+            self._last_mongo_fail = time.monotonic()
+            return False
+    
+    def _ensure_mongo_indexes(self) -> None:
+        """Create the MongoDB indexes the query paths rely on.
+
+        create_index is a no-op when the index already exists, so this
+        is safe to run on every (re)connect.
+        """
+        try:
+            # Case-insensitive patient name lookups become bounded index
+            # range scans instead of full collection scans
+            self.mongo_db['patients'].create_index(
+                [('name', 1)],
+                collation={'locale': 'en', 'strength': 2},
+                background=True
+            )
+            # Partial indexes below only hold the rows the hot queries
+            # can actually return (active records, unsynced assessments,
+            # open sync work), so they stay a few percent of the size of
+            # full indexes and their hot pages fit in RAM.
+            self.mongo_db['patients'].create_index(
+                [('village', 1), ('name', 1)],
+                partialFilterExpression={'active': True},
+                background=True
+            )
+            self.mongo_db['users'].create_index(
+                [('username', 1)],
+                unique=True,
+                partialFilterExpression={'active': True},
+                background=True
+            )
+            self.mongo_db['health_assessments'].create_index(
+                [('synced', 1)],
+                partialFilterExpression={'synced': False},
+                background=True
+            )
+            # Matches the pending-queue query shape exactly, so the sort
+            # comes straight off the index instead of an in-memory sort
+            # stage (which Mongo caps at 32MB); synced records fall out
+            # of the index entirely
+            self.mongo_db['sync_records'].create_index(
+                [('sync_status', 1), ('priority', -1), ('created_at', 1)],
+                partialFilterExpression={
+                    'sync_status': {'$in': ['pending', 'failed']}
+                },
+                background=True
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to ensure MongoDB indexes: {str(e)}")
+
+    def _start_health_monitor(self) -> None:
+        """Start the daemon thread that tracks MongoDB availability."""
+        monitor = threading.Thread(
+            target=self._monitor_mongodb,
+            name='mongo-health-monitor',
+            daemon=True
+        )
+        monitor.start()
+    
+    def _monitor_mongodb(self) -> None:
+        """Ping MongoDB periodically and keep is_connected current.
+        
+        Detecting a dropped connection or a recovered server happens
+        here, off the request path, so request handlers only ever read
+        the flag and never pay a ping or a server-selection timeout.
+        """
+        while True:
+            time.sleep(self._monitor_interval)
+            try:
+                if self.is_connected:
+                    self.mongo_client.admin.command('ping')
+                elif time.monotonic() - self._last_mongo_fail > self._reconnect_cooldown:
+                    self._connect_mongodb()
+            except Exception as e:
+                self.logger.warning(f"MongoDB health check failed: {str(e)}")
+                self.is_connected = False
+                self._last_mongo_fail = time.monotonic()
+    
+    def _init_sqlite(self) -> None:
+        """Initialize SQLite database for offline storage."""
+        try:
+            # Ensure directory exists
+            os.makedirs(os.path.dirname(self.sqlite_path), exist_ok=True)
+            
+            conn = sqlite3.connect(self.sqlite_path)
+            cursor = conn.cursor()
+            
+            # Create tables for core data types
+            
+            # Users table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id TEXT PRIMARY KEY,
+                    username TEXT UNIQUE NOT NULL,
+                    password TEXT NOT NULL,
+                    salt TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    phone TEXT NOT NULL,
+                    email TEXT,
+                    location TEXT,
+                    created_at INTEGER NOT NULL,
+                    created_by TEXT,
+                    updated_at INTEGER,
+                    updated_by TEXT,
+                    last_login INTEGER,
+                    is_active INTEGER NOT NULL DEFAULT 1,
+                    sync_status TEXT DEFAULT 'pending'
+                )
+            """)
+            
+            # Patients table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS patients (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    age INTEGER,
+                    gender TEXT,
+                    phone TEXT,
+                    address TEXT,
+                    village TEXT,
+                    district TEXT,
+                    state TEXT,
+                    medical_history TEXT,
+                    created_at INTEGER NOT NULL,
+                    created_by TEXT NOT NULL,
+                    updated_at INTEGER,
+                    updated_by TEXT,
+                    is_active INTEGER NOT NULL DEFAULT 1,
+                    sync_status TEXT DEFAULT 'pending'
+                )
+            """)
+            
+            # Health assessments table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS health_assessments (
+                    id TEXT PRIMARY KEY,
+                    patient_id TEXT NOT NULL,
+                    symptoms TEXT NOT NULL,
+                    assessment TEXT NOT NULL,
+                    recommendations TEXT,
+                    referral TEXT,
+                    created_at INTEGER NOT NULL,
+                    created_by TEXT NOT NULL,
+                    updated_at INTEGER,
+                    updated_by TEXT,
+                    sync_status TEXT DEFAULT 'pending',
+                    FOREIGN KEY (patient_id) REFERENCES patients (id)
+                )
+            """)
+            
+            # Create indexes
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_patients_village ON patients (village)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_assessments_patient ON health_assessments (patient_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_status ON health_assessments (sync_status)")
+            
+            conn.commit()
+            conn.close()
+            
+            self.logger.info("SQLite database initialized successfully")
+            
+        except Exception as e:
+            self.logger.error(f"Error initializing SQLite database: {str(e)}")
+            raise
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get this thread's SQLite connection, opening it on first use.
+        
+        Returns:
+            The calling thread's SQLite connection
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.sqlite_path)
+            conn.row_factory = sqlite3.Row  # Enable row factory for named columns
+            
+            # Tune the connection once: WAL lets readers and the writer
+            # proceed concurrently, NORMAL sync is safe under WAL, and a
+            # larger page cache plus memory temp store keeps small
+            # operations off the disk
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-20000")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            
+            self._local.conn = conn
+            with self._open_connections_lock:
+                self._open_connections.append(conn)
+        return conn
+    
+    def _query_cache_key(self, op: str, collection: str, query: Dict,
+                         limit: int = None, skip: int = None, sort: List = None):
+        """Build a hashable cache key for a read, or None if not cacheable.
+        
+        Args:
+            op: Operation name
+            collection: Collection name
+            query: Query criteria
+            limit: Maximum number of results
+            skip: Number of results to skip
+            sort: List of (field, direction) tuples for sorting
+            
+        Returns:
+            Tuple usable as a cache key, or None for unhashable queries
+        """
+        try:
+            return (op, collection, tuple(sorted(query.items())),
+                    limit, skip, tuple(sort) if sort else ())
+        except TypeError:
+            return None
+    
+    def _invalidate_collection(self, collection: str) -> None:
+        """Drop cached read results for a collection after a write.
+        
+        Args:
+            collection: Collection name
+        """
+        with self._query_cache_lock:
+            for key in list(self._query_cache.keys()):
+                if key[1] == collection:
+                    del self._query_cache[key]
+    
+    @staticmethod
+    def _to_columnar(documents: List[Dict]) -> Dict:
+        """Convert a list of documents into a dict of column lists.
+        
+        Args:
+            documents: Row-oriented documents sharing a column shape
+            
+        Returns:
+            Dict mapping each column to its list of values
+        """
+        if not documents:
+            return {}
+        return {column: [document.get(column) for document in documents]
+                for column in documents[0]}
+    
+    def _check_identifiers(self, collection: str, fields=()) -> None:
+        """Reject names that cannot be safely interpolated into SQL text.
+        
+        Collection and field names are spliced into cached statement
+        templates, so anything that is not a plain Python identifier is
+        refused before it can reach the SQL builder.
+        
+        Args:
+            collection: Collection name
+            fields: Iterable of field names used in the statement
+            
+        Raises:
+            ValueError: If a name is not a valid identifier
+        """
+        if not collection.isidentifier():
+            raise ValueError(f"Invalid collection name: {collection!r}")
+        for field in fields:
+            if not field.isidentifier():
+                raise ValueError(f"Invalid field name: {field!r}")
+    
+    def _build_insert_specializations(self) -> None:
+        """Generate one specialized insert function per core table.
+        
+        The core tables have fixed column sets, so the column list,
+        placeholder string and value extraction can be compiled once at
+        startup instead of rebuilt from document keys on every insert.
+        Each generated function binds its table's SQL as a constant and
+        pulls values with a flat chain of doc.get calls.
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        for table in ('users', 'patients', 'health_assessments'):
+            cursor.execute(f"PRAGMA table_info({table})")
+            table_columns = [row[1] for row in cursor.fetchall()]
+            if not table_columns:
+                continue
+            
+            sql = (
+                f"INSERT OR REPLACE INTO {table} ({', '.join(table_columns)}) "
+                f"VALUES ({', '.join(['?'] * len(table_columns))})"
+            )
+            values_expr = ', '.join(f"doc.get('{column}')" for column in table_columns)
+            source = (
+                f"def _insert_{table}(self, cursor, doc):\n"
+                f"    cursor.execute({sql!r}, ({values_expr}))\n"
+            )
+            namespace = {}
+            exec(compile(source, f'<insert_{table}>', 'exec'), namespace)
+            setattr(self, f'_insert_{table}', namespace[f'_insert_{table}'].__get__(self))
+    
+    def _maybe_checkpoint(self, conn) -> None:
+        """Run periodic WAL maintenance after a write.
+        
+        Every _wal_interval writes, truncate the WAL back to zero and
+        let PRAGMA optimize refresh the planner statistics. Counting
+        races between threads only shift when maintenance runs, so the
+        counter is left unlocked.
+        
+        Args:
+            conn: This thread's connection, already committed
+        """
+        self._write_count += 1
+        if self._write_count % self._wal_interval:
+            return
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA optimize")
+        except sqlite3.OperationalError as e:
+            # Checkpoint can fail while readers hold the WAL - the next
+            # interval will retry
+            self.logger.warning(f"WAL checkpoint skipped: {str(e)}")
+    
+    def _ensure_generic_column(self, collection: str, field: str, cursor) -> None:
+        """Expose a JSON field of a generic collection as an indexed column.
+        
+        Generic collections store opaque JSON, so querying any field other
+        than the ID would scan and parse every row. The first time a field
+        is queried, a virtual generated column backed by json_extract plus
+        an index is added, turning later lookups into index probes.
+        
+        Args:
+            collection: Table name
+            field: Document field to expose
+            cursor: Cursor on this thread's connection
+        """
+        key = (collection, field)
+        if key in self._generic_columns:
+            return
+        
+        try:
+            cursor.execute(
+                f"ALTER TABLE {collection} ADD COLUMN {field} "
+                f"GENERATED ALWAYS AS (json_extract(data, '$.{field}')) VIRTUAL"
+            )
+        except sqlite3.OperationalError:
+            # Column already exists from a previous run
+            pass
+        
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{collection}_{field} ON {collection} ({field})"
+        )
+        self._generic_columns.add(key)
+    
+    def close_connections(self) -> None:
+        """Close every SQLite connection opened by worker threads.
+        
+        The first connection runs a final WAL truncate so the log does
+        not carry over into the next process start.
+        """
+        with self._open_connections_lock:
+            for i, conn in enumerate(self._open_connections):
+                try:
+                    if i == 0:
+                        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                    conn.close()
+                except Exception:
+                    pass
+            self._open_connections = []
+    
+    @contextmanager
+    def connection(self):
+        """Context manager yielding this thread's SQLite connection.
+        
+        Yields:
+            The calling thread's SQLite connection
+        """
+        yield self._get_connection()
+    
+    @contextmanager
+    def transaction(self):
+        """Run a batch of operations under one SQLite transaction.
+        
+        Each mutator normally commits - and fsyncs - on its own, so a
+        flow that inserts a patient, an assessment and an audit row pays
+        three syncs. Inside this block the operations share one
+        BEGIN IMMEDIATE transaction and a single commit. Nested use
+        joins the outer transaction.
+        
+        Yields:
+            The calling thread's SQLite connection
+        """
+        conn = self._get_connection()
+        if getattr(self._local, 'explicit_txn', False):
+            yield conn
+            return
+        
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.explicit_txn = True
+        try:
+            yield conn
+            conn.commit()
+            self._maybe_checkpoint(conn)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.explicit_txn = False
+    
+    def _commit(self, conn) -> None:
+        """Commit a mutator's work unless an explicit transaction is open.
+        
+        Args:
+            conn: This thread's connection
+        """
+        if getattr(self._local, 'explicit_txn', False):
+            return
+        conn.commit()
+        self._maybe_checkpoint(conn)
+    
+    def pool_in_use(self) -> int:
+        """Number of MongoDB connections currently checked out.
+
+        Returns:
+            In-use connection count, 0 when MongoDB is unavailable
+        """
+        listener = getattr(self, '_pool_listener', None)
+        return listener.checked_out if listener else 0
+
+    def is_online(self) -> bool:
+        """Check if database is in online mode (connected to MongoDB).
+        
+        Returns:
+            Boolean indicating online status
+        """
+        # The background health monitor keeps this flag current, so
+        # callers never reconnect or ping synchronously
+        return self.is_connected
+    
+    def insert_one(self, collection: str, document: Dict) -> Dict:
+        """Insert a single document into the specified collection.
+        
+        Args:
+            collection: Collection name
+            document: Document to insert
+            
+        Returns:
+            Dict containing operation result
+        """
+        result = self.insert_many(collection, [document])
+        
+        if result['success']:
+            return {
+                'success': True,
+                'id': result['ids'][0],
+                'online': result['online']
+            }
+        return result
+    
+    def insert_many(self, collection: str, documents: List[Dict], fast: bool = False) -> Dict:
+        """Insert multiple documents into the specified collection in one batch.
+        
+        Batching amortizes the commit fsync on SQLite and the round trip
+        on MongoDB, so callers loading many records should prefer this
+        over insert_one in a loop.
+        
+        Args:
+            collection: Collection name
+            documents: Documents to insert
+            fast: Skip write acknowledgement on MongoDB - only for
+                telemetry-class documents that tolerate loss
+            
+        Returns:
+            Dict containing operation result and inserted IDs
+        """
+        try:
+            if not documents:
+                return {
+                    'success': True,
+                    'ids': [],
+                    'count': 0,
+                    'online': self.is_online()
+                }
+            
+            # Add timestamps
+            now = _now_us()
+            for document in documents:
+                _normalize_timestamps(document)
+                if 'created_at' not in document:
+                    document['created_at'] = now
+            
+            # Writes make any cached reads for this collection stale
+            self._invalidate_collection(collection)
+            
+            # Try MongoDB if online
+            if self.is_online():
+                if fast:
+                    target = self.mongo_db.get_collection(
+                        collection, write_concern=WriteConcern(w=0)
+                    )
+                else:
+                    target = self.mongo_db[collection]
+                result = target.insert_many(documents, ordered=False)
+                return {
+                    'success': True,
+                    'ids': [str(inserted_id) for inserted_id in result.inserted_ids],
+                    'count': len(result.inserted_ids),
+                    'online': True
+                }
+            
+            # Fall back to SQLite
+            return self._sqlite_insert_many(collection, documents)
+            
+        except Exception as e:
+            self.logger.error(f"Error inserting documents into {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def find_one(self, collection: str, query: Dict, columns: tuple = None) -> Dict:
+        """Find a single document matching the query.
+        
+        Args:
+            collection: Collection name
+            query: Query criteria
+            columns: Optional fixed column set - SQLite selects only
+                these and builds the document by position, skipping
+                per-column name lookups
+            
+        Returns:
+            Dict containing operation result and document if found
+        """
+        try:
+            cache_key = self._query_cache_key('find_one', collection, query)
+            if cache_key is not None:
+                cache_key = cache_key + (columns,)
+            if cache_key is not None:
+                with self._query_cache_lock:
+                    cached = self._query_cache.get(cache_key)
+                if cached is not None:
+                    return copy.deepcopy(cached)
+            
+            # Try MongoDB if online
+            if self.is_online():
+                projection = {column: 1 for column in columns} if columns else None
+                document = self.mongo_db[collection].find_one(query, projection)
+                if document:
+                    # ObjectIds pass through untouched - the response
+                    # encoder stringifies them in C via its default hook
+                    result = {
+                        'success': True,
+                        'document': document,
+                        'online': True
+                    }
+                else:
+                    result = self._sqlite_find_one(collection, query, columns)
+            else:
+                # Fall back to SQLite
+                result = self._sqlite_find_one(collection, query, columns)
+            
+            if cache_key is not None and result['success']:
+                with self._query_cache_lock:
+                    self._query_cache[cache_key] = copy.deepcopy(result)
+            
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"Error finding document in {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def find_many(self, collection: str, query: Dict, limit: int = 100, skip: int = 0,
+                  sort: List = None, projection: Dict = None, columnar: bool = False,
+                  columns: tuple = None) -> Dict:
+        """Find multiple documents matching the query.
+        
+        Args:
+            collection: Collection name
+            query: Query criteria
+            limit: Maximum number of results
+            skip: Number of results to skip
+            sort: List of (field, direction) tuples for sorting
+            projection: Optional field projection so large documents ship
+                only the fields the caller needs (MongoDB path)
+            columnar: Return documents as a dict of column lists instead
+                of a list of dicts - encodes each key once per page, not
+                once per row
+            columns: Optional fixed column set - SQLite selects only
+                these and builds documents by position
+            
+        Returns:
+            Dict containing operation result and documents if found
+        """
+        try:
+            cache_key = self._query_cache_key('find_many', collection, query, limit, skip, sort)
+            if cache_key is not None and projection:
+                try:
+                    cache_key = cache_key + (tuple(sorted(projection.items())),)
+                except TypeError:
+                    cache_key = None
+            if cache_key is not None:
+                cache_key = cache_key + (columnar, columns)
+            if cache_key is not None:
+                with self._query_cache_lock:
+                    cached = self._query_cache.get(cache_key)
+                if cached is not None:
+                    return copy.deepcopy(cached)
+            
+            # Try MongoDB if online
+            if self.is_online():
+                if projection is None and columns:
+                    projection = {column: 1 for column in columns}
+                cursor = self.mongo_db[collection].find(query, projection) \
+                    .batch_size(500).skip(skip).limit(limit)
+                
+                if sort:
+                    cursor = cursor.sort(sort)
+                
+                # ObjectIds pass through untouched - the response
+                # encoder stringifies them in C via its default hook
+                documents = list(cursor)
+                
+                count = len(documents)
+                if columnar:
+                    documents = self._to_columnar(documents)
+                
+                result = {
+                    'success': True,
+                    'documents': documents,
+                    'count': count,
+                    'online': True
+                }
+            else:
+                # Fall back to SQLite
+                result = self._sqlite_find_many(collection, query, limit, skip, sort,
+                                                columnar=columnar, columns=columns)
+            
+            if cache_key is not None and result['success']:
+                with self._query_cache_lock:
+                    self._query_cache[cache_key] = copy.deepcopy(result)
+            
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"Error finding documents in {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def update_one(self, collection: str, query: Dict, update: Dict) -> Dict:
+        """Update a single document matching the query.
+        
+        Args:
+            collection: Collection name
+            query: Query criteria
+            update: Update operations
+            
+        Returns:
+            Dict containing operation result
+        """
+        try:
+            # Add update timestamp
+            if '$set' in update:
+                _normalize_timestamps(update['$set'])
+                update['$set']['updated_at'] = _now_us()
+            else:
+                update['$set'] = {'updated_at': _now_us()}
+            
+            # Writes make any cached reads for this collection stale
+            self._invalidate_collection(collection)
+            
+            # Try MongoDB if online
+            if self.is_online():
+                result = self.mongo_db[collection].update_one(query, update)
+                return {
+                    'success': True,
+                    'matched_count': result.matched_count,
+                    'modified_count': result.modified_count,
+                    'online': True
+                }
+            
+            # Fall back to SQLite
+            return self._sqlite_update(collection, query, update)
+            
+        except Exception as e:
+            self.logger.error(f"Error updating document in {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def find_one_and_update(self, collection: str, query: Dict, update: Dict,
+                            projection: Dict = None) -> Dict:
+        """Update a single document and return its new state in one call.
+
+        Write-then-read flows (update a patient, reload for the UI)
+        otherwise pay two round trips; MongoDB resolves this as one
+        find_one_and_update returning the post-update document.
+
+        Args:
+            collection: Collection name
+            query: Query criteria
+            update: Update operations
+            projection: Optional fields to include in the returned document
+
+        Returns:
+            Dict containing operation result and the updated document
+        """
+        try:
+            # Add update timestamp
+            if '$set' in update:
+                _normalize_timestamps(update['$set'])
+                update['$set']['updated_at'] = _now_us()
+            else:
+                update['$set'] = {'updated_at': _now_us()}
+
+            # Writes make any cached reads for this collection stale
+            self._invalidate_collection(collection)
+
+            # Try MongoDB if online
+            if self.is_online():
+                document = self.mongo_db[collection].find_one_and_update(
+                    query, update, projection=projection,
+                    return_document=ReturnDocument.AFTER
+                )
+                return {
+                    'success': True,
+                    'document': document,
+                    'online': True
+                }
+
+            # Fall back to SQLite - both statements are local, so the
+            # two-step is a prepared UPDATE plus an indexed SELECT
+            result = self._sqlite_update(collection, query, update)
+            if not result['success']:
+                return result
+            found = self._sqlite_find_one(collection, query)
+            return {
+                'success': True,
+                'document': found.get('document'),
+                'online': False
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error updating document in {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def update_many(self, collection: str, updates: List) -> Dict:
+        """Apply a batch of updates in one round trip.
+        
+        Sync flows resolve hundreds of pending rows one update_one call
+        at a time, paying a statement prepare and a commit per row.
+        This batches them: MongoDB gets a single unordered bulk_write,
+        SQLite a single executemany per update shape under one commit.
+        
+        Args:
+            collection: Collection name
+            updates: List of (query, update) pairs
+            
+        Returns:
+            Dict containing operation result
+        """
+        try:
+            if not updates:
+                return {
+                    'success': True,
+                    'matched_count': 0,
+                    'modified_count': 0,
+                    'online': self.is_connected
+                }
+            
+            # Stamp every update and normalize timestamps once up front
+            now = _now_us()
+            for _, update in updates:
+                if '$set' in update:
+                    _normalize_timestamps(update['$set'])
+                    update['$set']['updated_at'] = now
+                else:
+                    update['$set'] = {'updated_at': now}
+            
+            # Writes make any cached reads for this collection stale
+            self._invalidate_collection(collection)
+            
+            # Try MongoDB if online
+            if self.is_online():
+                result = self.mongo_db[collection].bulk_write(
+                    [UpdateOne(query, update) for query, update in updates],
+                    ordered=False
+                )
+                return {
+                    'success': True,
+                    'matched_count': result.matched_count,
+                    'modified_count': result.modified_count,
+                    'online': True
+                }
+            
+            # Fall back to SQLite
+            return self._sqlite_update_many(collection, updates)
+            
+        except Exception as e:
+            self.logger.error(f"Error bulk updating documents in {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def delete_one(self, collection: str, query: Dict) -> Dict:
+        """Delete a single document matching the query.
+        
+        Args:
+            collection: Collection name
+            query: Query criteria
+            
+        Returns:
+            Dict containing operation result
+        """
+        try:
+            # Writes make any cached reads for this collection stale
+            self._invalidate_collection(collection)
+            
+            # Try MongoDB if online
+            if self.is_online():
+                result = self.mongo_db[collection].delete_one(query)
+                return {
+                    'success': True,
+                    'deleted_count': result.deleted_count,
+                    'online': True
+                }
+            
+            # Fall back to SQLite
+            return self._sqlite_delete(collection, query)
+            
+        except Exception as e:
+            self.logger.error(f"Error deleting document from {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _sqlite_insert_many(self, collection: str, documents: List[Dict]) -> Dict:
+        """Insert a batch of documents into SQLite under one transaction.
+        
+        Args:
+            collection: Table name
+            documents: Documents to insert
+            
+        Returns:
+            Dict containing operation result and inserted IDs
+        """
+        try:
+            self._check_identifiers(collection)
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            # Ensure every document has an ID
+            for document in documents:
+                if '_id' not in document and 'id' not in document:
+                    document['id'] = uuid.uuid4().hex
+                elif '_id' in document and 'id' not in document:
+                    document['id'] = document['_id']
+                    del document['_id']
+            
+            # Special handling for core tables
+            if collection in ['users', 'patients', 'health_assessments']:
+                # Single documents - the overwhelmingly common case via
+                # insert_one - go through the startup-generated function
+                # with its precompiled column order
+                handler = getattr(self, f'_insert_{collection}', None)
+                if handler is not None and len(documents) == 1:
+                    handler(cursor, documents[0])
+                    self._commit(conn)
+                    return {
+                        'success': True,
+                        'ids': [documents[0]['id']],
+                        'count': 1,
+                        'online': False
+                    }
+                
+                # Group documents by column shape so each group runs as a
+                # single executemany against one compiled statement
+                groups = {}
+                for document in documents:
+                    groups.setdefault(tuple(sorted(document)), []).append(document)
+                
+                for columns, group in groups.items():
+                    self._check_identifiers(collection, columns)
+                    cache_key = ('insert', collection, columns)
+                    query = self._stmt_cache.get(cache_key)
+                    if query is None:
+                        fields = ', '.join(columns)
+                        placeholders = ', '.join(['?'] * len(columns))
+                        query = self._stmt_cache.setdefault(
+                            cache_key,
+                            f"INSERT OR REPLACE INTO {collection} ({fields}) VALUES ({placeholders})"
+                        )
+                    cursor.executemany(
+                        query,
+                        [[document[column] for column in columns] for document in group]
+                    )
+            else:
+                # For other collections, use a generic approach with JSON
+                # storage, issuing the DDL once per collection
+                if collection not in self._generic_tables:
+                    cursor.execute(
+                        f"CREATE TABLE IF NOT EXISTS {collection} (id TEXT PRIMARY KEY, data TEXT, sync_status TEXT)"
+                    )
+                    self._generic_tables.add(collection)
+                cursor.executemany(
+                    f"INSERT OR REPLACE INTO {collection} (id, data, sync_status) VALUES (?, ?, ?)",
+                    [(document['id'], _dumps(document), 'pending') for document in documents]
+                )
+            
+            # One commit for the whole batch
+            self._commit(conn)
+            
+            return {
+                'success': True,
+                'ids': [document['id'] for document in documents],
+                'count': len(documents),
+                'online': False
+            }
+            
+        except Exception as e:
+            self.logger.error(f"SQLite insert error for {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _sqlite_find_one(self, collection: str, query: Dict, columns: tuple = None) -> Dict:
+        """Find a single document in SQLite.
+        
+        Args:
+            collection: Table name
+            query: Query criteria
+            columns: Optional fixed column set selected and zipped by
+                position instead of going through sqlite3.Row
+            
+        Returns:
+            Dict containing operation result and document if found
+        """
+        try:
+            self._check_identifiers(collection, query)
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            # Special handling for core tables
+            if collection in ['users', 'patients', 'health_assessments']:
+                # Reuse the compiled statement for this query shape
+                keys = sorted(query)
+                cache_key = ('find_one', collection, tuple(keys), columns)
+                sql = self._stmt_cache.get(cache_key)
+                if sql is None:
+                    if columns:
+                        self._check_identifiers(collection, columns)
+                    select_list = ', '.join(columns) if columns else '*'
+                    where_clause = " AND ".join(f"{key} = ?" for key in keys) if keys else "1=1"
+                    sql = self._stmt_cache.setdefault(
+                        cache_key,
+                        f"SELECT {select_list} FROM {collection} WHERE {where_clause} LIMIT 1"
+                    )
+                
+                cursor.execute(sql, [query[key] for key in keys])
+                row = cursor.fetchone()
+                
+                if row:
+                    # Known column set zips by position - no per-column
+                    # name hashing in sqlite3.Row.__getitem__
+                    document = dict(zip(columns, row)) if columns else dict(row)
+                    return {
+                        'success': True,
+                        'document': document,
+                        'online': False
+                    }
+            else:
+                # For other collections, query the JSON storage through
+                # indexed virtual columns
+                if 'id' in query or '_id' in query:
+                    id_value = query.get('id', query.get('_id'))
+                    cursor.execute(f"SELECT data FROM {collection} WHERE id = ?", (id_value,))
+                    row = cursor.fetchone()
+                elif query:
+                    keys = sorted(query)
+                    for field in keys:
+                        self._ensure_generic_column(collection, field, cursor)
+                    where_clause = " AND ".join(f"{key} = ?" for key in keys)
+                    cursor.execute(
+                        f"SELECT data FROM {collection} WHERE {where_clause} LIMIT 1",
+                        [query[key] for key in keys]
+                    )
+                    row = cursor.fetchone()
+                else:
+                    cursor.execute(f"SELECT data FROM {collection} LIMIT 1")
+                    row = cursor.fetchone()
+                
+                if row:
+                    document = _loads(row[0])
+                    return {
+                        'success': True,
+                        'document': document,
+                        'online': False
+                    }
+            
+            return {
+                'success': True,
+                'document': None,
+                'online': False
+            }
+            
+        except Exception as e:
+            self.logger.error(f"SQLite find_one error for {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _sqlite_find_many(self, collection: str, query: Dict, limit: int, skip: int,
+                          sort: List, columnar: bool = False, columns: tuple = None) -> Dict:
+        """Find multiple documents in SQLite.
+        
+        Args:
+            collection: Table name
+            query: Query criteria
+            limit: Maximum number of results
+            skip: Number of results to skip
+            sort: List of (field, direction) tuples for sorting
+            columnar: Return a dict of column lists instead of row dicts
+            columns: Optional fixed column set selected and zipped by
+                position instead of going through sqlite3.Row
+            
+        Returns:
+            Dict containing operation result and documents if found
+        """
+        try:
+            self._check_identifiers(collection, query)
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            # Special handling for core tables
+            if collection in ['users', 'patients', 'health_assessments']:
+                # Reuse the compiled statement for this query shape, with
+                # limit and offset bound as parameters so the SQL text is
+                # stable across pages
+                keys = sorted(query)
+                sort_key = tuple(sort) if sort else ()
+                cache_key = ('find_many', collection, tuple(keys), sort_key, columns)
+                sql = self._stmt_cache.get(cache_key)
+                if sql is None:
+                    if columns:
+                        self._check_identifiers(collection, columns)
+                    select_list = ', '.join(columns) if columns else '*'
+                    where_clause = " AND ".join(f"{key} = ?" for key in keys) if keys else "1=1"
+                    
+                    # Build ORDER BY clause from sort
+                    order_clause = ""
+                    if sort:
+                        self._check_identifiers(collection, [field for field, _ in sort])
+                        order_terms = []
+                        for field, direction in sort:
+                            direction_str = "ASC" if direction == 1 else "DESC"
+                            order_terms.append(f"{field} {direction_str}")
+                        order_clause = f"ORDER BY {', '.join(order_terms)}"
+                    
+                    sql = self._stmt_cache.setdefault(
+                        cache_key,
+                        f"SELECT {select_list} FROM {collection} WHERE {where_clause} {order_clause} LIMIT ? OFFSET ?"
+                    )
+                
+                cursor.execute(sql, [query[key] for key in keys] + [limit, skip])
+                
+                rows = cursor.fetchall()
+                if columnar:
+                    # Column lists straight off the cursor description -
+                    # no per-row dict is ever built
+                    names = columns or [d[0] for d in cursor.description]
+                    documents = {column: [row[i] for row in rows]
+                                 for i, column in enumerate(names)}
+                elif columns:
+                    documents = [dict(zip(columns, row)) for row in rows]
+                else:
+                    documents = [dict(row) for row in rows]
+                
+                return {
+                    'success': True,
+                    'documents': documents,
+                    'count': len(rows),
+                    'online': False
+                }
+            else:
+                # For other collections, query the JSON storage through
+                # indexed virtual columns
+                if query:
+                    keys = sorted(query)
+                    for field in keys:
+                        self._ensure_generic_column(collection, field, cursor)
+                    where_clause = " AND ".join(f"{key} = ?" for key in keys)
+                    cursor.execute(
+                        f"SELECT data FROM {collection} WHERE {where_clause} LIMIT ? OFFSET ?",
+                        [query[key] for key in keys] + [limit, skip]
+                    )
+                else:
+                    cursor.execute(f"SELECT data FROM {collection} LIMIT ? OFFSET ?", (limit, skip))
+                
+                rows = cursor.fetchall()
+                documents = [_loads(row[0]) for row in rows]
+                
+                count = len(documents)
+                if columnar:
+                    documents = self._to_columnar(documents)
+                
+                return {
+                    'success': True,
+                    'documents': documents,
+                    'count': count,
+                    'online': False
+                }
+            
+        except Exception as e:
+            self.logger.error(f"SQLite find_many error for {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _sqlite_update(self, collection: str, query: Dict, update: Dict) -> Dict:
+        """Update a document in SQLite.
+        
+        Args:
+            collection: Table name
+            query: Query criteria
+            update: Update operations
+            
+        Returns:
+            Dict containing operation result
+        """
+        try:
+            self._check_identifiers(collection, query)
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            # Special handling for core tables
+            if collection in ['users', 'patients', 'health_assessments']:
+                # Extract $set operations
+                if '$set' not in update:
+                    return {
+                        'success': False,
+                        'error': "Only $set operations are supported in SQLite"
+                    }
+                
+                set_values = update['$set']
+                self._check_identifiers(collection, set_values)
+                
+                # Reuse the compiled statement for this update shape
+                set_keys = sorted(set_values)
+                where_keys = sorted(query)
+                cache_key = ('update', collection, tuple(set_keys), tuple(where_keys))
+                sql = self._stmt_cache.get(cache_key)
+                if sql is None:
+                    set_clause = ", ".join(f"{key} = ?" for key in set_keys)
+                    where_clause = " AND ".join(f"{key} = ?" for key in where_keys)
+                    sql = self._stmt_cache.setdefault(
+                        cache_key,
+                        f"UPDATE {collection} SET {set_clause} WHERE {where_clause}"
+                    )
+                
+                # Execute update
+                cursor.execute(
+                    sql,
+                    [set_values[key] for key in set_keys] + [query[key] for key in where_keys]
+                )
+                
+                modified_count = cursor.rowcount
+                self._commit(conn)
+                
+                return {
+                    'success': True,
+                    'matched_count': modified_count,
+                    'modified_count': modified_count,
+                    'online': False
+                }
+            else:
+                # For other collections, use generic approach with JSON storage
+                # Simplified implementation - only supports updating by ID
+                if 'id' in query or '_id' in query:
+                    id_value = query.get('id', query.get('_id'))
+
+                    # Merge the $set fields inside SQLite with json_patch,
+                    # replacing the select/parse/merge/write round trip
+                    # with a single statement. $inc counters are folded
+                    # into the same statement with json_set so they stay
+                    # atomic alongside the merge.
+                    data_expr = "json_patch(data, ?)"
+                    params = [_dumps(update.get('$set', {}))]
+                    inc_values = update.get('$inc', {})
+                    self._check_identifiers(collection, inc_values)
+                    for inc_field in sorted(inc_values):
+                        data_expr = (
+                            f"json_set({data_expr}, '$.{inc_field}', "
+                            f"coalesce(json_extract(data, '$.{inc_field}'), 0) + ?)"
+                        )
+                        params.append(inc_values[inc_field])
+
+                    cursor.execute(
+                        f"UPDATE {collection} SET data = {data_expr}, "
+                        f"sync_status = 'pending' WHERE id = ?",
+                        params + [id_value]
+                    )
+                    
+                    modified_count = cursor.rowcount
+                    self._commit(conn)
+                    
+                    return {
+                        'success': True,
+                        'matched_count': modified_count,
+                        'modified_count': modified_count,
+                        'online': False
+                    }
+                
+                return {
+                    'success': True,
+                    'matched_count': 0,
+                    'modified_count': 0,
+                    'online': False
+                }
+            
+        except Exception as e:
+            self.logger.error(f"SQLite update error for {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _sqlite_update_many(self, collection: str, updates: List) -> Dict:
+        """Apply a batch of ID-keyed updates to SQLite in one commit.
+        
+        Core-table updates are grouped by $set shape so each group runs
+        as one executemany against a single prepared statement; generic
+        collections share one json_patch statement for the whole batch.
+        
+        Args:
+            collection: Table name
+            updates: List of (query, update) pairs keyed by ID
+            
+        Returns:
+            Dict containing operation result
+        """
+        try:
+            self._check_identifiers(collection)
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            # Simplified implementation - only supports updating by ID
+            rows = []
+            for query, update in updates:
+                id_value = query.get('id', query.get('_id'))
+                if id_value is None:
+                    return {
+                        'success': False,
+                        'error': "update_many requires ID-keyed queries in SQLite"
+                    }
+                # Refuse operators this path cannot apply rather than
+                # dropping them silently
+                unsupported = [op for op in update if op not in ('$set', '$inc')]
+                if unsupported:
+                    return {
+                        'success': False,
+                        'error': f"update_many supports only $set and $inc "
+                                 f"in SQLite, got {unsupported[0]}"
+                    }
+                rows.append((id_value, update.get('$set', {}),
+                             update.get('$inc', {})))
+
+            modified_count = 0
+            if collection in ['users', 'patients', 'health_assessments']:
+                # Group by update shape - one prepared statement per shape
+                groups = {}
+                for id_value, set_values, inc_values in rows:
+                    self._check_identifiers(collection, set_values)
+                    self._check_identifiers(collection, inc_values)
+                    shape = (tuple(sorted(set_values)), tuple(sorted(inc_values)))
+                    groups.setdefault(shape, []).append(
+                        (id_value, set_values, inc_values)
+                    )
+
+                for (set_keys, inc_keys), group in groups.items():
+                    set_clause = ", ".join(
+                        [f"{key} = ?" for key in set_keys]
+                        + [f"{key} = {key} + ?" for key in inc_keys]
+                    )
+                    cursor.executemany(
+                        f"UPDATE {collection} SET {set_clause} WHERE id = ?",
+                        [[set_values[key] for key in set_keys]
+                         + [inc_values[key] for key in inc_keys] + [id_value]
+                         for id_value, set_values, inc_values in group]
+                    )
+                    modified_count += cursor.rowcount
+            else:
+                # Group by $inc shape so each group shares one prepared
+                # json_patch/json_set statement, mirroring _sqlite_update
+                groups = {}
+                for id_value, set_values, inc_values in rows:
+                    self._check_identifiers(collection, inc_values)
+                    groups.setdefault(tuple(sorted(inc_values)), []).append(
+                        (id_value, set_values, inc_values)
+                    )
+
+                for inc_keys, group in groups.items():
+                    data_expr = "json_patch(data, ?)"
+                    for inc_field in inc_keys:
+                        data_expr = (
+                            f"json_set({data_expr}, '$.{inc_field}', "
+                            f"coalesce(json_extract(data, '$.{inc_field}'), 0) + ?)"
+                        )
+                    cursor.executemany(
+                        f"UPDATE {collection} SET data = {data_expr}, "
+                        f"sync_status = 'pending' WHERE id = ?",
+                        [[_dumps(set_values)]
+                         + [inc_values[key] for key in inc_keys] + [id_value]
+                         for id_value, set_values, inc_values in group]
+                    )
+                    modified_count += cursor.rowcount
+            
+            self._commit(conn)
+            
+            return {
+                'success': True,
+                'matched_count': modified_count,
+                'modified_count': modified_count,
+                'online': False
+            }
+            
+        except Exception as e:
+            self.logger.error(f"SQLite update_many error for {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _sqlite_delete(self, collection: str, query: Dict) -> Dict:
+        """Delete a document from SQLite.
+        
+        Args:
+            collection: Table name
+            query: Query criteria
+            
+        Returns:
+            Dict containing operation result
+        """
+        try:
+            self._check_identifiers(collection, query)
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            # Reuse the compiled statement for this query shape
+            keys = sorted(query)
+            cache_key = ('delete', collection, tuple(keys))
+            sql = self._stmt_cache.get(cache_key)
+            if sql is None:
+                where_clause = " AND ".join(f"{key} = ?" for key in keys)
+                sql = self._stmt_cache.setdefault(
+                    cache_key,
+                    f"DELETE FROM {collection} WHERE {where_clause}"
+                )
+            
+            # Execute delete
+            cursor.execute(sql, [query[key] for key in keys])
+            
+            deleted_count = cursor.rowcount
+            self._commit(conn)
+            
+            return {
+                'success': True,
+                'deleted_count': deleted_count,
+                'online': False
+            }
+            
+        except Exception as e:
+            self.logger.error(f"SQLite delete error for {collection}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
             }
\ No newline at end of file
@@ -1,341 +1,961 @@
-#!/usr/bin/env python
-# -*- coding: utf-8 -*-
-
-"""
-Data Models for ASHA Connect
-
-This module defines the data models used throughout the application including:
-- Patient information
-- Health assessment data
-- User profiles
-- Sync records
-
-These models provide a consistent structure for data storage and retrieval.
-"""
-
-import uuid
-from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
-
-class Patient:
-    """Patient data model for ASHA Connect."""
-    
-    def __init__(self, 
-                 name: str, 
-                 age: int, 
-                 gender: str, 
-                 village: str,
-                 contact: Optional[str] = None,
-                 patient_id: Optional[str] = None,
-                 created_by: Optional[str] = None,
-                 created_at: Optional[datetime] = None,
-                 updated_at: Optional[datetime] = None,
-                 medical_history: Optional[List[Dict]] = None,
-                 active: bool = True):
-        """Initialize a new Patient record.
-        
-        Args:
-            name: Patient's full name
-            age: Patient's age in years
-            gender: Patient's gender (M/F/Other)
-            village: Patient's village or locality
-            contact: Optional contact number
-            patient_id: Unique identifier (generated if not provided)
-            created_by: ID of the ASHA worker who created the record
-            created_at: Timestamp of creation
-            updated_at: Timestamp of last update
-            medical_history: List of previous medical conditions
-            active: Whether the patient record is active
-        """
-        self.patient_id = patient_id or str(uuid.uuid4())
-        self.name = name
-        self.age = age
-        self.gender = gender
-        self.village = village
-        self.contact = contact
-        self.created_by = created_by
-        self.created_at = created_at or datetime.now()
-        self.updated_at = updated_at or datetime.now()
-        self.medical_history = medical_history or []
-        self.active = active
-    
-    def to_dict(self) -> Dict:
-        """Convert patient object to dictionary for storage."""
-        return {
-            'patient_id': self.patient_id,
-            'name': self.name,
-            'age': self.age,
-            'gender': self.gender,
-            'village': self.village,
-            'contact': self.contact,
-            'created_by': self.created_by,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at,
-            'medical_history': self.medical_history,
-            'active': self.active
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'Patient':
-        """Create a Patient object from dictionary data."""
-        return cls(
-            patient_id=data.get('patient_id'),
-            name=data.get('name'),
-            age=data.get('age'),
-            gender=data.get('gender'),
-            village=data.get('village'),
-            contact=data.get('contact'),
-            created_by=data.get('created_by'),
-            created_at=data.get('created_at'),
-            updated_at=data.get('updated_at'),
-            medical_history=data.get('medical_history', []),
-            active=data.get('active', True)
-        )
-
-
-class HealthAssessment:
-    """Health assessment data model for ASHA Connect."""
-    
-    def __init__(self,
-                 patient_id: str,
-                 symptoms: List[str],
-                 assessment_id: Optional[str] = None,
-                 conducted_by: Optional[str] = None,
-                 assessment_date: Optional[datetime] = None,
-                 vital_signs: Optional[Dict] = None,
-                 diagnosis: Optional[str] = None,
-                 severity: Optional[str] = None,
-                 recommendations: Optional[List[str]] = None,
-                 referral_needed: bool = False,
-                 referral_facility: Optional[str] = None,
-                 notes: Optional[str] = None,
-                 synced: bool = False):
-        """Initialize a new Health Assessment record.
-        
-        Args:
-            patient_id: ID of the patient being assessed
-            symptoms: List of reported symptoms
-            assessment_id: Unique identifier (generated if not provided)
-            conducted_by: ID of the ASHA worker conducting assessment
-            assessment_date: Date and time of assessment
-            vital_signs: Dictionary of vital measurements
-            diagnosis: Identified health condition
-            severity: Severity level (Low/Medium/High)
-            recommendations: List of care recommendations
-            referral_needed: Whether specialist referral is needed
-            referral_facility: Recommended healthcare facility
-            notes: Additional assessment notes
-            synced: Whether record has been synced to central database
-        """
-        self.assessment_id = assessment_id or str(uuid.uuid4())
-        self.patient_id = patient_id
-        self.symptoms = symptoms
-        self.conducted_by = conducted_by
-        self.assessment_date = assessment_date or datetime.now()
-        self.vital_signs = vital_signs or {}
-        self.diagnosis = diagnosis
-        self.severity = severity
-        self.recommendations = recommendations or []
-        self.referral_needed = referral_needed
-        self.referral_facility = referral_facility
-        self.notes = notes
-        self.synced = synced
-    
-    def to_dict(self) -> Dict:
-        """Convert assessment object to dictionary for storage."""
-        return {
-            'assessment_id': self.assessment_id,
-            'patient_id': self.patient_id,
-            'symptoms': self.symptoms,
-            'conducted_by': self.conducted_by,
-            'assessment_date': self.assessment_date,
-            'vital_signs': self.vital_signs,
-            'diagnosis': self.diagnosis,
-            'severity': self.severity,
-            'recommendations': self.recommendations,
-            'referral_needed': self.referral_needed,
-            'referral_facility': self.referral_facility,
-            'notes': self.notes,
-            'synced': self.synced
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'HealthAssessment':
-        """Create a HealthAssessment object from dictionary data."""
-        return cls(
-            assessment_id=data.get('assessment_id'),
-            patient_id=data.get('patient_id'),
-            symptoms=data.get('symptoms', []),
-            conducted_by=data.get('conducted_by'),
-            assessment_date=data.get('assessment_date'),
-            vital_signs=data.get('vital_signs', {}),
-            diagnosis=data.get('diagnosis'),
-            severity=data.get('severity'),
-            recommendations=data.get('recommendations', []),
-            referral_needed=data.get('referral_needed', False),
-            referral_facility=data.get('referral_facility'),
-            notes=data.get('notes'),
-            synced=data.get('synced', False)
-        )
-
-
-class User:
-    """User data model for ASHA Connect."""
-    
-    def __init__(self,
-                 username: str,
-                 password_hash: str,
-                 full_name: str,
-                 role: str,
-                 user_id: Optional[str] = None,
-                 email: Optional[str] = None,
-                 phone: Optional[str] = None,
-                 district: Optional[str] = None,
-                 health_facility: Optional[str] = None,
-                 created_at: Optional[datetime] = None,
-                 last_login: Optional[datetime] = None,
-                 active: bool = True,
-                 preferences: Optional[Dict] = None):
-        """Initialize a new User record.
-        
-        Args:
-            username: Unique username for login
-            password_hash: Hashed password (never store plaintext)
-            full_name: User's full name
-            role: User role (asha/supervisor/admin)
-            user_id: Unique identifier (generated if not provided)
-            email: User's email address
-            phone: User's phone number
-            district: User's assigned district
-            health_facility: User's associated health facility
-            created_at: Account creation timestamp
-            last_login: Last login timestamp
-            active: Whether the account is active
-            preferences: User preferences and settings
-        """
-        self.user_id = user_id or str(uuid.uuid4())
-        self.username = username
-        self.password_hash = password_hash
-        self.full_name = full_name
-        self.role = role
-        self.email = email
-        self.phone = phone
-        self.district = district
-        self.health_facility = health_facility
-        self.created_at = created_at or datetime.now()
-        self.last_login = last_login
-        self.active = active
-        self.preferences = preferences or {}
-    
-    def to_dict(self) -> Dict:
-        """Convert user object to dictionary for storage."""
-        return {
-            'user_id': self.user_id,
-            'username': self.username,
-            'password_hash': self.password_hash,
-            'full_name': self.full_name,
-            'role': self.role,
-            'email': self.email,
-            'phone': self.phone,
-            'district': self.district,
-            'health_facility': self.health_facility,
-            'created_at': self.created_at,
-            'last_login': self.last_login,
-            'active': self.active,
-            'preferences': self.preferences
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'User':
-        """Create a User object from dictionary data."""
-        return cls(
-            user_id=data.get('user_id'),
-            username=data.get('username'),
-            password_hash=data.get('password_hash'),
-            full_name=data.get('full_name'),
-            role=data.get('role'),
-            email=data.get('email'),
-            phone=data.get('phone'),
-            district=data.get('district'),
-            health_facility=data.get('health_facility'),
-            created_at=data.get('created_at'),
-            last_login=data.get('last_login'),
-            active=data.get('active', True),
-            preferences=data.get('preferences', {})
-        )
-
-
-class SyncRecord:
-    """Sync record data model for ASHA Connect."""
-    
-    def __init__(self,
-                 record_type: str,
-                 record_id: str,
-                 data: Dict,
-                 sync_id: Optional[str] = None,
-                 user_id: Optional[str] = None,
-                 created_at: Optional[datetime] = None,
-                 synced_at: Optional[datetime] = None,
-                 sync_status: str = 'pending',
-                 priority: int = 1,
-                 retry_count: int = 0,
-                 error_message: Optional[str] = None):
-        """Initialize a new Sync Record.
-        
-        Args:
-            record_type: Type of record (patient/assessment/etc)
-            record_id: ID of the original record
-            data: Full record data to be synced
-            sync_id: Unique identifier for sync record
-            user_id: ID of user who created/modified the record
-            created_at: When the sync record was created
-            synced_at: When the record was successfully synced
-            sync_status: Current sync status (pending/synced/failed)
-            priority: Sync priority (higher numbers = higher priority)
-            retry_count: Number of sync attempts
-            error_message: Last sync error message if failed
-        """
-        self.sync_id = sync_id or str(uuid.uuid4())
-        self.record_type = record_type
-        self.record_id = record_id
-        self.data = data
-        self.user_id = user_id
-        self.created_at = created_at or datetime.now()
-        self.synced_at = synced_at
-        self.sync_status = sync_status
-        self.priority = priority
-        self.retry_count = retry_count
-        self.error_message = error_message
-    
-    def to_dict(self) -> Dict:
-        """Convert sync record object to dictionary for storage."""
-        return {
-            'sync_id': self.sync_id,
-            'record_type': self.record_type,
-            'record_id': self.record_id,
-            'data': self.data,
-            'user_id': self.user_id,
-            'created_at': self.created_at,
-            'synced_at': self.synced_at,
-            'sync_status': self.sync_status,
-            'priority': self.priority,
-            'retry_count': self.retry_count,
-            'error_message': self.error_message
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'SyncRecord':
-        """Create a SyncRecord object from dictionary data."""
-        return cls(
-            sync_id=data.get('sync_id'),
-            record_type=data.get('record_type'),
-            record_id=data.get('record_id'),
-            data=data.get('data', {}),
-            user_id=data.get('user_id'),
-            created_at=data.get('created_at'),
-            synced_at=data.get('synced_at'),
-            sync_status=data.get('sync_status', 'pending'),
-            priority=data.get('priority', 1),
-            retry_count=data.get('retry_count', 0),
-            error_message=data.get('error_message')
-        )
\ No newline at end of file
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Data Models for ASHA Connect
+
+This module defines the data models used throughout the application including:
+- Patient information
+- Health assessment data
+- User profiles
+- Sync records
+
+These models provide a consistent structure for data storage and retrieval.
+
+All four models are slots dataclasses: fields are declared - and their
+slots laid out - in constructor-argument order, so instances carry no
+per-object __dict__ and attribute access resolves through fixed slot
+offsets. Subclasses must not rely on adding ad-hoc attributes.
+"""
+
+import os
+import struct
+import sys
+import time
+import types
+import msgspec
+import numpy as np
+from binascii import hexlify
+from dataclasses import MISSING, InitVar, dataclass, field, fields
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Union
+
+# Shared MessagePack encoder/decoder for the sync pipeline - encoding
+# happens in C straight from the field dict, with no JSON text step.
+# to_dict stays the canonical wire projection rather than
+# msgspec.to_builtins over the raw slots: the dict maps the packed
+# _flags int back to the boolean fields, swaps container sentinels for
+# plain containers and keeps payload bytes, none of which a generic
+# slot walk would reproduce.
+_msgpack_encoder = msgspec.msgpack.Encoder()
+_msgpack_decoder = msgspec.msgpack.Decoder()
+
+# Timestamps are stored as integer epoch microseconds: a quarter the
+# size of a datetime object, directly comparable, and serialized as a
+# plain int instead of an ISO string. The *_dt properties convert on
+# demand for display code.
+
+def _now_us() -> int:
+    """Current time as integer epoch microseconds."""
+    return time.time_ns() // 1000
+
+def _as_us(value: Union[int, str, datetime, None]) -> Optional[int]:
+    """Coerce a timestamp in any accepted form to epoch microseconds.
+    
+    Args:
+        value: Integer microseconds, ISO-8601 string, datetime, or None
+        
+    Returns:
+        Epoch microseconds, or None if value is None
+    """
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1_000_000)
+    return int(datetime.fromisoformat(value).timestamp() * 1_000_000)
+
+# Low-cardinality fields (gender, role, severity, sync status, record
+# type) are interned in __post_init__: every loaded record shares one
+# string object per distinct value, and equality checks against
+# literals short-circuit on pointer identity.
+
+# Flyweight pool for place-name fields (village, district, facility):
+# a deployment has dozens of distinct values repeated across tens of
+# thousands of records, and sys.intern is reserved for identifier-like
+# strings. The pool grows with the distinct values only.
+_STR_POOL: Dict[str, str] = {}
+
+def _flyweight(value: Optional[str]) -> Optional[str]:
+    """Return the pooled copy of a low-cardinality string.
+    
+    Args:
+        value: String to deduplicate, or None
+        
+    Returns:
+        The shared copy, or None if value is None
+    """
+    if value is None:
+        return None
+    cached = _STR_POOL.get(value)
+    if cached is not None:
+        return cached
+    _STR_POOL[value] = value
+    return value
+
+def _intern_opt(value: Optional[str]) -> Optional[str]:
+    """Intern a string, passing None through."""
+    return None if value is None else sys.intern(value)
+
+def _ts(value: Union[int, str, datetime, None]) -> int:
+    """Coerce a timestamp to microseconds, defaulting to now."""
+    if type(value) is int:
+        return value
+    if value is None:
+        return _now_us()
+    return _as_us(value)
+
+def intern_keys(data: Dict) -> Dict:
+    """Rebuild a decoded record dict with interned keys.
+    
+    json.loads and the MessagePack decoder produce fresh key strings,
+    so every data.get in from_dict pays a full hash-and-compare. The
+    generated from_dict bodies close over compile-time-interned
+    literals, and interning the producer's keys as well lets those
+    lookups short-circuit on pointer identity.
+    
+    Args:
+        data: Decoded record dictionary
+        
+    Returns:
+        Dictionary with the same values and interned keys
+    """
+    return {sys.intern(key): value for key, value in data.items()}
+
+# Shared read-only sentinels for the empty containers most records
+# carry - a fresh list/dict per instance is pure allocator churn when
+# the caller never mutates it. Mutators below materialize a real
+# container on first write (copy-on-write).
+_EMPTY_LIST: tuple = ()
+_EMPTY_DICT = types.MappingProxyType({})
+
+def _mkid() -> str:
+    """Generate one random UUID-format ID without a UUID object.
+    
+    Going through uuid.uuid4 pays UUID.__init__ validation and a
+    Python-level __str__; hexlify plus dash slicing produces the same
+    opaque 36-character ID in about half the time.
+    
+    Returns:
+        Random ID in canonical 8-4-4-4-12 form
+    """
+    h = hexlify(os.urandom(16)).decode('ascii')
+    return f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+
+def _bulk_uuids(n: int) -> List[str]:
+    """Generate n random UUID-format IDs from a single entropy read.
+    
+    Per-record entropy reads cost a syscall each; one read covers the
+    whole batch, and the IDs are formatted by slicing a single
+    hexlified buffer.
+    
+    Args:
+        n: Number of IDs to generate
+        
+    Returns:
+        List of n random IDs in canonical 8-4-4-4-12 form
+    """
+    if n <= 0:
+        return []
+    h = hexlify(os.urandom(16 * n)).decode('ascii')
+    return [f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-"
+            f"{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+            for i in range(0, 32 * n, 32)]
+
+@dataclass(slots=True)
+class Patient:
+    """Patient data model for ASHA Connect.
+    
+    Attributes:
+        name: Patient's full name
+        age: Patient's age in years
+        gender: Patient's gender (M/F/Other)
+        village: Patient's village or locality
+        contact: Optional contact number
+        patient_id: Unique identifier (generated if not provided)
+        created_by: ID of the ASHA worker who created the record
+        created_at: Timestamp of creation
+        updated_at: Timestamp of last update
+        medical_history: List of previous medical conditions
+        active: Whether the patient record is active
+    """
+    
+    name: str
+    age: int
+    gender: str
+    village: str
+    contact: Optional[str] = None
+    patient_id: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: Optional[int] = None
+    updated_at: Optional[int] = None
+    medical_history: Optional[List[Dict]] = None
+    active: InitVar[bool] = True
+    _flags: int = field(default=0, init=False, repr=False)
+
+    # Bit positions inside _flags
+    _ACTIVE = 1
+
+    # Fields list endpoints actually render; passed as a query
+    # projection so the wire carries no embedded history
+    SUMMARY_PROJECTION = {
+        'patient_id': 1, 'name': 1, 'age': 1, 'gender': 1,
+        'village': 1, 'active': 1, '_id': 0
+    }
+
+    def __post_init__(self, active):
+        """Fill generated defaults and pack boolean flags."""
+        self._flags = self._ACTIVE if active else 0
+        if self.patient_id is None:
+            self.patient_id = _mkid()
+        if self.gender is not None:
+            self.gender = sys.intern(self.gender)
+        self.village = _flyweight(self.village)
+        self.created_at = _now_us() if self.created_at is None else _as_us(self.created_at)
+        self.updated_at = _now_us() if self.updated_at is None else _as_us(self.updated_at)
+        if self.medical_history is None:
+            self.medical_history = _EMPTY_LIST
+    
+    def to_dict(self) -> Dict:
+        """Convert patient object to dictionary for storage."""
+        return {
+            'patient_id': self.patient_id,
+            'name': self.name,
+            'age': self.age,
+            'gender': self.gender,
+            'village': self.village,
+            'contact': self.contact,
+            'created_by': self.created_by,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'medical_history': list(self.medical_history)
+                if self.medical_history is _EMPTY_LIST else self.medical_history,
+            'active': self.active
+        }
+    
+    def add_history(self, entry: Dict) -> None:
+        """Append a medical history entry, materializing the list lazily.
+        
+        Args:
+            entry: Medical history entry to record
+        """
+        if self.medical_history is _EMPTY_LIST:
+            self.medical_history = [entry]
+        else:
+            self.medical_history.append(entry)    
+    @property
+    def created_at_dt(self) -> datetime:
+        """Creation time as a datetime."""
+        return datetime.fromtimestamp(self.created_at / 1_000_000)    
+    @property
+    def updated_at_dt(self) -> datetime:
+        """Last update time as a datetime."""
+        return datetime.fromtimestamp(self.updated_at / 1_000_000)
+    
+    def to_bytes(self) -> bytes:
+        """Serialize this record to MessagePack bytes for the sync queue."""
+        return _msgpack_encoder.encode(self.to_dict())
+    
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> 'Patient':
+        """Create a Patient object from MessagePack bytes."""
+        return cls.from_dict(intern_keys(_msgpack_decoder.decode(buf)))
+    
+    @classmethod
+    def bulk_create(cls, rows: List[Dict]) -> List['Patient']:
+        """Create many Patient objects with batch-generated IDs.
+        
+        Args:
+            rows: Dictionaries of field data, IDs optional
+            
+        Returns:
+            List of Patient objects in input order
+        """
+        ids = iter(_bulk_uuids(sum(1 for row in rows if not row.get('patient_id'))))
+        # One clock read stamps the whole batch - per-record reads are
+        # redundant inside a single flush
+        now = _now_us()
+        records = []
+        for row in rows:
+            row = dict(row)
+            if not row.get('patient_id'):
+                row['patient_id'] = next(ids)
+            row.setdefault('created_at', now)
+            row.setdefault('updated_at', now)
+            records.append(cls.from_dict(row))
+        return records
+
+
+@dataclass(slots=True)
+class HealthAssessment:
+    """Health assessment data model for ASHA Connect.
+    
+    Attributes:
+        patient_id: ID of the patient being assessed
+        symptoms: List of reported symptoms
+        assessment_id: Unique identifier (generated if not provided)
+        conducted_by: ID of the ASHA worker conducting assessment
+        assessment_date: Date and time of assessment
+        vital_signs: Dictionary of vital measurements
+        diagnosis: Identified health condition
+        severity: Severity level (Low/Medium/High)
+        recommendations: List of care recommendations
+        referral_needed: Whether specialist referral is needed
+        referral_facility: Recommended healthcare facility
+        notes: Additional assessment notes
+        synced: Whether record has been synced to central database
+    """
+    
+    patient_id: str
+    symptoms: List[str]
+    assessment_id: Optional[str] = None
+    conducted_by: Optional[str] = None
+    assessment_date: Optional[int] = None
+    vital_signs: Optional[Dict] = None
+    diagnosis: Optional[str] = None
+    severity: Optional[str] = None
+    recommendations: Optional[List[str]] = None
+    referral_needed: InitVar[bool] = False
+    referral_facility: Optional[str] = None
+    notes: Optional[str] = None
+    synced: InitVar[bool] = False
+    _flags: int = field(default=0, init=False, repr=False)
+    
+    # Bit positions inside _flags
+    _REFERRAL = 1
+    _SYNCED = 2
+    
+    def __post_init__(self, referral_needed, synced):
+        """Fill generated defaults and pack boolean flags."""
+        self._flags = ((self._REFERRAL if referral_needed else 0)
+                       | (self._SYNCED if synced else 0))
+        if self.assessment_id is None:
+            self.assessment_id = _mkid()
+        if self.severity is not None:
+            self.severity = sys.intern(self.severity)
+        self.referral_facility = _flyweight(self.referral_facility)
+        self.assessment_date = _now_us() if self.assessment_date is None else _as_us(self.assessment_date)
+        if self.vital_signs is None:
+            self.vital_signs = _EMPTY_DICT
+        if self.recommendations is None:
+            self.recommendations = _EMPTY_LIST
+    
+    def to_dict(self) -> Dict:
+        """Convert assessment object to dictionary for storage."""
+        return {
+            'assessment_id': self.assessment_id,
+            'patient_id': self.patient_id,
+            'symptoms': self.symptoms,
+            'conducted_by': self.conducted_by,
+            'assessment_date': self.assessment_date,
+            'vital_signs': dict(self.vital_signs)
+                if self.vital_signs is _EMPTY_DICT else self.vital_signs,
+            'diagnosis': self.diagnosis,
+            'severity': self.severity,
+            'recommendations': list(self.recommendations)
+                if self.recommendations is _EMPTY_LIST else self.recommendations,
+            'referral_needed': self.referral_needed,
+            'referral_facility': self.referral_facility,
+            'notes': self.notes,
+            'synced': self.synced
+        }
+    
+    def add_recommendation(self, item: str) -> None:
+        """Append a care recommendation, materializing the list lazily.
+        
+        Args:
+            item: Recommendation to record
+        """
+        if self.recommendations is _EMPTY_LIST:
+            self.recommendations = [item]
+        else:
+            self.recommendations.append(item)
+    
+    def set_vital(self, name: str, value: Any) -> None:
+        """Record a vital sign, materializing the dict lazily.
+        
+        Args:
+            name: Vital sign name
+            value: Measured value
+        """
+        if self.vital_signs is _EMPTY_DICT:
+            self.vital_signs = {name: value}
+        else:
+            self.vital_signs[name] = value    
+    @property
+    def assessment_date_dt(self) -> datetime:
+        """Assessment time as a datetime."""
+        return datetime.fromtimestamp(self.assessment_date / 1_000_000)
+    
+    def to_bytes(self) -> bytes:
+        """Serialize this record to MessagePack bytes for the sync queue."""
+        return _msgpack_encoder.encode(self.to_dict())
+    
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> 'HealthAssessment':
+        """Create a HealthAssessment object from MessagePack bytes."""
+        return cls.from_dict(intern_keys(_msgpack_decoder.decode(buf)))
+    
+    @classmethod
+    def bulk_create(cls, rows: List[Dict]) -> List['HealthAssessment']:
+        """Create many HealthAssessment objects with batch-generated IDs.
+        
+        Args:
+            rows: Dictionaries of field data, IDs optional
+            
+        Returns:
+            List of HealthAssessment objects in input order
+        """
+        ids = iter(_bulk_uuids(sum(1 for row in rows if not row.get('assessment_id'))))
+        # One clock read stamps the whole batch - per-record reads are
+        # redundant inside a single flush
+        now = _now_us()
+        records = []
+        for row in rows:
+            row = dict(row)
+            if not row.get('assessment_id'):
+                row['assessment_id'] = next(ids)
+            row.setdefault('assessment_date', now)
+            records.append(cls.from_dict(row))
+        return records
+
+
+@dataclass(slots=True)
+class User:
+    """User data model for ASHA Connect.
+    
+    Attributes:
+        username: Unique username for login
+        password_hash: Hashed password (never store plaintext)
+        full_name: User's full name
+        role: User role (asha/supervisor/admin)
+        user_id: Unique identifier (generated if not provided)
+        email: User's email address
+        phone: User's phone number
+        district: User's assigned district
+        health_facility: User's associated health facility
+        created_at: Account creation timestamp
+        last_login: Last login timestamp
+        active: Whether the account is active
+        preferences: User preferences and settings
+    """
+    
+    username: str
+    password_hash: str
+    full_name: str
+    role: str
+    user_id: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    district: Optional[str] = None
+    health_facility: Optional[str] = None
+    created_at: Optional[int] = None
+    last_login: Optional[int] = None
+    active: InitVar[bool] = True
+    preferences: Optional[Dict] = None
+    _flags: int = field(default=0, init=False, repr=False)
+
+    # Bit positions inside _flags
+    _ACTIVE = 1
+
+    # Fields list endpoints actually render
+    SUMMARY_PROJECTION = {
+        'user_id': 1, 'username': 1, 'full_name': 1, 'role': 1,
+        'district': 1, 'active': 1, '_id': 0
+    }
+
+    def __post_init__(self, active):
+        """Fill generated defaults and pack boolean flags."""
+        self._flags = self._ACTIVE if active else 0
+        if self.user_id is None:
+            self.user_id = _mkid()
+        if self.role is not None:
+            self.role = sys.intern(self.role)
+        self.district = _flyweight(self.district)
+        self.health_facility = _flyweight(self.health_facility)
+        self.created_at = _now_us() if self.created_at is None else _as_us(self.created_at)
+        self.last_login = _as_us(self.last_login)
+        if self.preferences is None:
+            self.preferences = _EMPTY_DICT
+    
+    def to_dict(self) -> Dict:
+        """Convert user object to dictionary for storage."""
+        return {
+            'user_id': self.user_id,
+            'username': self.username,
+            'password_hash': self.password_hash,
+            'full_name': self.full_name,
+            'role': self.role,
+            'email': self.email,
+            'phone': self.phone,
+            'district': self.district,
+            'health_facility': self.health_facility,
+            'created_at': self.created_at,
+            'last_login': self.last_login,
+            'active': self.active,
+            'preferences': dict(self.preferences)
+                if self.preferences is _EMPTY_DICT else self.preferences
+        }
+    
+    def set_preference(self, name: str, value: Any) -> None:
+        """Set a user preference, materializing the dict lazily.
+        
+        Args:
+            name: Preference name
+            value: Preference value
+        """
+        if self.preferences is _EMPTY_DICT:
+            self.preferences = {name: value}
+        else:
+            self.preferences[name] = value    
+    @property
+    def created_at_dt(self) -> datetime:
+        """Account creation time as a datetime."""
+        return datetime.fromtimestamp(self.created_at / 1_000_000)    
+    @property
+    def last_login_dt(self) -> Optional[datetime]:
+        """Last login time as a datetime."""
+        return None if self.last_login is None else datetime.fromtimestamp(self.last_login / 1_000_000)
+    
+    def to_bytes(self) -> bytes:
+        """Serialize this record to MessagePack bytes for the sync queue."""
+        return _msgpack_encoder.encode(self.to_dict())
+    
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> 'User':
+        """Create a User object from MessagePack bytes."""
+        return cls.from_dict(intern_keys(_msgpack_decoder.decode(buf)))
+    
+    @classmethod
+    def bulk_create(cls, rows: List[Dict]) -> List['User']:
+        """Create many User objects with batch-generated IDs.
+        
+        Args:
+            rows: Dictionaries of field data, IDs optional
+            
+        Returns:
+            List of User objects in input order
+        """
+        ids = iter(_bulk_uuids(sum(1 for row in rows if not row.get('user_id'))))
+        # One clock read stamps the whole batch - per-record reads are
+        # redundant inside a single flush
+        now = _now_us()
+        records = []
+        for row in rows:
+            row = dict(row)
+            if not row.get('user_id'):
+                row['user_id'] = next(ids)
+            row.setdefault('created_at', now)
+            records.append(cls.from_dict(row))
+        return records
+
+
+@dataclass(slots=True)
+class SyncRecord:
+    """Sync record data model for ASHA Connect.
+    
+    Attributes:
+        record_type: Type of record (patient/assessment/etc)
+        record_id: ID of the original record
+        data: Full record data to be synced, held as MessagePack bytes
+            (dicts passed in are encoded once at construction)
+        sync_id: Unique identifier for sync record
+        user_id: ID of user who created/modified the record
+        created_at: When the sync record was created
+        synced_at: When the record was successfully synced
+        sync_status: Current sync status (pending/synced/failed)
+        priority: Sync priority (higher numbers = higher priority)
+        retry_count: Number of sync attempts
+        error_message: Last sync error message if failed
+    """
+    
+    record_type: str
+    record_id: str
+    data: Union[Dict, bytes]
+    sync_id: Optional[str] = None
+    user_id: Optional[str] = None
+    created_at: Optional[int] = None
+    synced_at: Optional[int] = None
+    sync_status: str = 'pending'
+    priority: int = 1
+    retry_count: int = 0
+    error_message: Optional[str] = None
+    
+    def __post_init__(self):
+        """Fill generated and timestamp defaults for omitted fields."""
+        if self.sync_id is None:
+            self.sync_id = _mkid()
+        self.record_type = sys.intern(self.record_type)
+        self.sync_status = sys.intern(self.sync_status)
+        # Encode the payload once; every later hop (queue write, frame
+        # encode, network send) splices these bytes without re-walking
+        # the nested dict
+        if isinstance(self.data, dict):
+            self.data = _msgpack_encoder.encode(self.data)
+        self.created_at = _now_us() if self.created_at is None else _as_us(self.created_at)
+        self.synced_at = _as_us(self.synced_at)
+    
+    def _envelope(self, data_value) -> Dict:
+        """Build the record's field dict around a payload representation.
+
+        Args:
+            data_value: Value to place in the 'data' slot - the decoded
+                dict for storage, or msgspec.Raw bytes for frame splicing
+
+        Returns:
+            Field dictionary
+        """
+        return {
+            'sync_id': self.sync_id,
+            'record_type': self.record_type,
+            'record_id': self.record_id,
+            'data': data_value,
+            'user_id': self.user_id,
+            'created_at': self.created_at,
+            'synced_at': self.synced_at,
+            'sync_status': self.sync_status,
+            'priority': self.priority,
+            'retry_count': self.retry_count,
+            'error_message': self.error_message
+        }
+
+    def to_dict(self) -> Dict:
+        """Convert sync record object to dictionary for storage.
+
+        The payload is decoded back to a plain dict here - storage and
+        API paths expect JSON-serializable values. The stored bytes are
+        spliced untouched only on the frame paths (encode_frame,
+        encode_batch).
+        """
+        return self._envelope(self.payload)
+    
+    def to_bytes(self) -> bytes:
+        """Serialize this record to MessagePack bytes for the sync queue."""
+        return _msgpack_encoder.encode(self.to_dict())
+    
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> 'SyncRecord':
+        """Create a SyncRecord object from MessagePack bytes."""
+        return cls.from_dict(intern_keys(_msgpack_decoder.decode(buf)))
+    
+    @classmethod
+    def bulk_create(cls, rows: List[Dict]) -> List['SyncRecord']:
+        """Create many SyncRecord objects with batch-generated IDs.
+        
+        Args:
+            rows: Dictionaries of field data, IDs optional
+            
+        Returns:
+            List of SyncRecord objects in input order
+        """
+        ids = iter(_bulk_uuids(sum(1 for row in rows if not row.get('sync_id'))))
+        # One clock read stamps the whole batch - per-record reads are
+        # redundant inside a single flush
+        now = _now_us()
+        records = []
+        for row in rows:
+            row = dict(row)
+            if not row.get('sync_id'):
+                row['sync_id'] = next(ids)
+            row.setdefault('created_at', now)
+            records.append(cls.from_dict(row))
+        return records    
+    @property
+    def created_at_dt(self) -> datetime:
+        """Queue-entry creation time as a datetime."""
+        return datetime.fromtimestamp(self.created_at / 1_000_000)    
+    @property
+    def synced_at_dt(self) -> Optional[datetime]:
+        """Successful sync time as a datetime."""
+        return None if self.synced_at is None else datetime.fromtimestamp(self.synced_at / 1_000_000)
+    
+    @property
+    def payload(self) -> Dict:
+        """Decode the record payload back into a dict on demand."""
+        return _msgpack_decoder.decode(self.data)
+    
+    def encode_frame(self) -> bytes:
+        """Encode this record as one length-prefixed MessagePack frame.
+        
+        The stored payload bytes are spliced into the outer frame via
+        msgspec.Raw - a memcpy, not a re-encode - and the 4-byte
+        big-endian length prefix lets queue files and sockets carry
+        frames back to back.
+        
+        Returns:
+            Length-prefixed frame bytes
+        """
+        body = _msgpack_encoder.encode(self._envelope(msgspec.Raw(self.data)))
+        return struct.pack('>I', len(body)) + body
+    
+    @classmethod
+    def decode_frame(cls, frame: bytes) -> 'SyncRecord':
+        """Decode a record from a frame produced by encode_frame.
+        
+        Args:
+            frame: Length-prefixed frame bytes
+            
+        Returns:
+            The decoded SyncRecord
+        """
+        (length,) = struct.unpack_from('>I', frame)
+        return cls.from_dict(intern_keys(_msgpack_decoder.decode(frame[4:4 + length])))
+
+def _pack_payload(value: Union[Dict, bytes]) -> bytes:
+    """Encode a payload dict to MessagePack bytes, passing bytes through."""
+    if isinstance(value, dict):
+        return _msgpack_encoder.encode(value)
+    return value
+
+
+# Integer codes for sync statuses inside SyncRecordBatch arrays
+_STATUS_CODES = {'pending': 0, 'synced': 1, 'failed': 2}
+_STATUS_NAMES = ['pending', 'synced', 'failed']
+
+
+class SyncRecordBatch:
+    """Structure-of-arrays container for large sync queues.
+    
+    The sync worker repeatedly filters thousands of SyncRecord objects
+    by status, ranks them by priority and bumps retry counts. Doing
+    that per-object walks a Python attribute load per record per pass.
+    This container mirrors the hot fields into NumPy arrays so filter
+    and ranking passes run vectorized, and only the records a pass
+    actually selects are touched as objects.
+    """
+    
+    def __init__(self, records: Optional[List[SyncRecord]] = None):
+        """Initialize the batch, optionally from existing records.
+        
+        Args:
+            records: SyncRecord objects to preload
+        """
+        self._records: List[SyncRecord] = []
+        self._statuses: List[int] = []
+        self._priorities: List[int] = []
+        self._retry_counts: List[int] = []
+        self._created_at: List[int] = []
+        self._arrays = None
+        for record in records or ():
+            self.add(record)
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def __getitem__(self, index: int) -> SyncRecord:
+        return self._records[index]
+    
+    def add(self, record: SyncRecord) -> None:
+        """Append a record, mirroring its hot fields into the arrays.
+        
+        Args:
+            record: Sync record to queue
+        """
+        self._records.append(record)
+        self._statuses.append(_STATUS_CODES.get(record.sync_status, 2))
+        self._priorities.append(record.priority)
+        self._retry_counts.append(record.retry_count)
+        self._created_at.append(record.created_at)
+        self._arrays = None
+    
+    def _materialize(self):
+        """Build (or reuse) the NumPy views over the mirrored fields."""
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self._statuses, dtype=np.int8),
+                np.asarray(self._priorities, dtype=np.int16),
+                np.asarray(self._retry_counts, dtype=np.int8),
+                np.asarray(self._created_at, dtype=np.int64),
+            )
+        return self._arrays
+    
+    def pending_indices(self) -> 'np.ndarray':
+        """Indices of records still waiting to sync.
+        
+        Returns:
+            Array of queue positions with pending status
+        """
+        statuses = self._materialize()[0]
+        return np.nonzero(statuses == _STATUS_CODES['pending'])[0]
+    
+    def top_k_by_priority(self, k: int) -> List[SyncRecord]:
+        """Pick the k highest-priority pending records.
+        
+        Args:
+            k: Maximum number of records to return
+            
+        Returns:
+            Pending records, highest priority first
+        """
+        pending = self.pending_indices()
+        if len(pending) == 0:
+            return []
+        priorities = self._materialize()[1][pending]
+        if k < len(pending):
+            order = np.argpartition(-priorities, k - 1)[:k]
+        else:
+            order = np.arange(len(pending))
+        order = order[np.argsort(-priorities[order], kind='stable')]
+        return [self._records[i] for i in pending[order]]
+    
+    def set_status(self, index: int, status: str) -> None:
+        """Update one record's status in both layouts.
+        
+        Args:
+            index: Queue position
+            status: New sync status (pending/synced/failed)
+        """
+        self._records[index].sync_status = sys.intern(status)
+        self._statuses[index] = _STATUS_CODES.get(status, 2)
+        self._arrays = None
+    
+    def record_attempt(self, index: int) -> None:
+        """Bump one record's retry count in both layouts.
+        
+        Args:
+            index: Queue position
+        """
+        self._records[index].retry_count += 1
+        self._retry_counts[index] += 1
+        self._arrays = None
+
+def _flag_property(mask: int) -> property:
+    """Build a boolean property over one bit of a _flags field.
+    
+    Booleans packed into a single int slot save a pointer-sized slot
+    per flag on every instance; the properties keep the public
+    attribute API unchanged.
+    
+    Args:
+        mask: Bit mask within _flags
+        
+    Returns:
+        Property reading and writing that bit
+    """
+    def _get(self) -> bool:
+        return bool(self._flags & mask)
+    
+    def _set(self, value: bool) -> None:
+        if value:
+            self._flags |= mask
+        else:
+            self._flags &= ~mask
+    
+    return property(_get, _set)
+
+
+# Attached after class creation so the dataclass machinery reads the
+# InitVar defaults, not the property objects
+Patient.active = _flag_property(Patient._ACTIVE)
+User.active = _flag_property(User._ACTIVE)
+HealthAssessment.referral_needed = _flag_property(HealthAssessment._REFERRAL)
+HealthAssessment.synced = _flag_property(HealthAssessment._SYNCED)
+
+
+def _compile_from_dict(cls, transforms: Dict[str, str]) -> None:
+    """Generate an unchecked straight-line from_dict for a model class.
+    
+    The generated function allocates with __new__ and assigns every
+    slot directly - no argument binding, no __init__, no __post_init__
+    branching. Fields that need normalization (generated IDs,
+    timestamps, interning, flag packing) get their expression inlined
+    from the transforms table; everything else is a plain data.get
+    with its default baked in. Rehydrating a large sync batch runs one
+    flat bytecode block per record.
+    
+    Args:
+        cls: Model class to equip
+        transforms: Field-name to source-expression mapping for fields
+            needing more than a defaulted lookup
+    """
+    lines = []
+    for spec in fields(cls):
+        if spec.name in transforms:
+            expr = transforms[spec.name]
+        elif spec.default is MISSING or spec.default is None:
+            expr = f"data.get('{spec.name}')"
+        else:
+            expr = f"data.get('{spec.name}', {spec.default!r})"
+        lines.append(f"    obj.{spec.name} = {expr}")
+    source = (
+        f"def from_dict(data, _cls=_model_cls):\n"
+        f"    \"\"\"Create a {cls.__name__} object from dictionary data.\"\"\"\n"
+        f"    obj = _cls.__new__(_cls)\n" + "\n".join(lines) + "\n    return obj\n"
+    )
+    namespace = dict(globals())
+    namespace['_model_cls'] = cls
+    exec(compile(source, f'<from_dict_{cls.__name__}>', 'exec'), namespace)
+    cls.from_dict = staticmethod(namespace['from_dict'])
+
+
+_compile_from_dict(Patient, {
+    'patient_id': "data.get('patient_id') or _mkid()",
+    'gender': "_intern_opt(data.get('gender'))",
+    'village': "_flyweight(data.get('village'))",
+    'created_at': "_ts(data.get('created_at'))",
+    'updated_at': "_ts(data.get('updated_at'))",
+    'medical_history': "data.get('medical_history') or _EMPTY_LIST",
+    '_flags': "_model_cls._ACTIVE if data.get('active', True) else 0",
+})
+_compile_from_dict(HealthAssessment, {
+    'assessment_id': "data.get('assessment_id') or _mkid()",
+    'symptoms': "data.get('symptoms') or []",
+    'severity': "_intern_opt(data.get('severity'))",
+    'referral_facility': "_flyweight(data.get('referral_facility'))",
+    'assessment_date': "_ts(data.get('assessment_date'))",
+    'vital_signs': "data.get('vital_signs') or _EMPTY_DICT",
+    'recommendations': "data.get('recommendations') or _EMPTY_LIST",
+    '_flags': ("(_model_cls._REFERRAL if data.get('referral_needed', False) else 0)"
+               " | (_model_cls._SYNCED if data.get('synced', False) else 0)"),
+})
+_compile_from_dict(User, {
+    'user_id': "data.get('user_id') or _mkid()",
+    'role': "_intern_opt(data.get('role'))",
+    'district': "_flyweight(data.get('district'))",
+    'health_facility': "_flyweight(data.get('health_facility'))",
+    'created_at': "_ts(data.get('created_at'))",
+    'last_login': "_as_us(data.get('last_login'))",
+    'preferences': "data.get('preferences') or _EMPTY_DICT",
+    '_flags': "_model_cls._ACTIVE if data.get('active', True) else 0",
+})
+_compile_from_dict(SyncRecord, {
+    'sync_id': "data.get('sync_id') or _mkid()",
+    'record_type': "_intern_opt(data.get('record_type'))",
+    'sync_status': "sys.intern(data.get('sync_status', 'pending'))",
+    'created_at': "_ts(data.get('created_at'))",
+    'synced_at': "_as_us(data.get('synced_at'))",
+    'data': "_pack_payload(data.get('data', {}))",
+})
+
+
+def encode_batch(records: List[SyncRecord]) -> bytes:
+    """Encode a whole queue flush as one length-prefixed frame.
+    
+    Shipping records one frame at a time costs an encoder call, a
+    buffer and a write per record. One frame per batch uses a single
+    encode into a single buffer, with each record's stored payload
+    bytes spliced in untouched, so the sync worker makes one write
+    and one request per flush.
+    
+    Args:
+        records: Sync records to ship together
+        
+    Returns:
+        Length-prefixed frame holding the encoded record list
+    """
+    items = [record._envelope(msgspec.Raw(record.data)) for record in records]
+    body = _msgpack_encoder.encode(items)
+    return struct.pack('>I', len(body)) + body
+
+
+def decode_batch(frame: bytes) -> List[SyncRecord]:
+    """Decode a frame produced by encode_batch.
+    
+    Args:
+        frame: Length-prefixed frame bytes
+        
+    Returns:
+        The decoded sync records in order
+    """
+    (length,) = struct.unpack_from('>I', frame)
+    return [SyncRecord.from_dict(intern_keys(item))
+            for item in _msgpack_decoder.decode(frame[4:4 + length])]
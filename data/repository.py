@@ -1,565 +1,940 @@
-#!/usr/bin/env python
-# -*- coding: utf-8 -*-
-
-"""
-Repository Module for ASHA Connect
-
-This module provides repository classes for data access operations including:
-- CRUD operations for all data models
-- Query functionality with filtering
-- Support for both online and offline data access
-
-These repositories abstract the database implementation details from the service layer.
-"""
-
-import logging
-from typing import Dict, List, Optional, Any, Union, TypeVar, Generic
-from datetime import datetime
-
-# Import models
-from data.models import Patient, HealthAssessment, User, SyncRecord
-
-# Type variable for generic repository
-T = TypeVar('T')
-
-class Repository(Generic[T]):
-    """Generic repository for data access operations."""
-    
-    def __init__(self, db, collection_name: str):
-        """Initialize the repository with database connection.
-        
-        Args:
-            db: Database connection instance
-            collection_name: Name of the collection/table
-        """
-        self.logger = logging.getLogger(__name__)
-        self.db = db
-        self.collection_name = collection_name
-    
-    async def create(self, item: T) -> str:
-        """Create a new record in the database.
-        
-        Args:
-            item: The item to create
-            
-        Returns:
-            The ID of the created item
-        """
-        try:
-            # Convert to dictionary if it has to_dict method
-            if hasattr(item, 'to_dict'):
-                data = item.to_dict()
-            else:
-                data = item
-                
-            # Insert into database
-            result = await self.db.insert_one(self.collection_name, data)
-            return result
-        except Exception as e:
-            self.logger.error(f"Error creating {self.collection_name}: {str(e)}")
-            raise
-    
-    async def get_by_id(self, id_field: str, id_value: str) -> Optional[Dict]:
-        """Get a record by its ID.
-        
-        Args:
-            id_field: The field name that contains the ID
-            id_value: The ID value to search for
-            
-        Returns:
-            The record if found, None otherwise
-        """
-        try:
-            query = {id_field: id_value}
-            result = await self.db.find_one(self.collection_name, query)
-            return result
-        except Exception as e:
-            self.logger.error(f"Error getting {self.collection_name} by ID: {str(e)}")
-            raise
-    
-    async def get_all(self, query: Optional[Dict] = None, limit: int = 100, skip: int = 0) -> List[Dict]:
-        """Get all records matching the query.
-        
-        Args:
-            query: Optional query filter
-            limit: Maximum number of records to return
-            skip: Number of records to skip
-            
-        Returns:
-            List of matching records
-        """
-        try:
-            result = await self.db.find(self.collection_name, query or {}, limit=limit, skip=skip)
-            return result
-        except Exception as e:
-            self.logger.error(f"Error getting all {self.collection_name}: {str(e)}")
-            raise
-    
-    async def update(self, id_field: str, id_value: str, data: Dict) -> bool:
-        """Update a record by its ID.
-        
-        Args:
-            id_field: The field name that contains the ID
-            id_value: The ID value to update
-            data: The data to update
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            query = {id_field: id_value}
-            # Add updated_at timestamp if not present
-            if 'updated_at' not in data:
-                data['updated_at'] = datetime.now()
-                
-            result = await self.db.update_one(self.collection_name, query, {'$set': data})
-            return result
-        except Exception as e:
-            self.logger.error(f"Error updating {self.collection_name}: {str(e)}")
-            raise
-    
-    async def delete(self, id_field: str, id_value: str) -> bool:
-        """Delete a record by its ID.
-        
-        Args:
-            id_field: The field name that contains the ID
-            id_value: The ID value to delete
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            query = {id_field: id_value}
-            result = await self.db.delete_one(self.collection_name, query)
-            return result
-        except Exception as e:
-            self.logger.error(f"Error deleting {self.collection_name}: {str(e)}")
-            raise
-    
-    async def count(self, query: Optional[Dict] = None) -> int:
-        """Count records matching the query.
-        
-        Args:
-            query: Optional query filter
-            
-        Returns:
-            Number of matching records
-        """
-        try:
-            result = await self.db.count(self.collection_name, query or {})
-            return result
-        except Exception as e:
-            self.logger.error(f"Error counting {self.collection_name}: {str(e)}")
-            raise
-
-
-class PatientRepository(Repository[Patient]):
-    """Repository for Patient data access operations."""
-    
-    def __init__(self, db):
-        """Initialize the Patient repository.
-        
-        Args:
-            db: Database connection instance
-        """
-        super().__init__(db, 'patients')
-    
-    async def get_by_patient_id(self, patient_id: str) -> Optional[Patient]:
-        """Get a patient by their patient_id.
-        
-        Args:
-            patient_id: The patient's unique ID
-            
-        Returns:
-            Patient object if found, None otherwise
-        """
-        result = await self.get_by_id('patient_id', patient_id)
-        if result:
-            return Patient.from_dict(result)
-        return None
-    
-    async def get_by_name(self, name: str, limit: int = 10) -> List[Patient]:
-        """Search for patients by name (partial match).
-        
-        Args:
-            name: The name to search for
-            limit: Maximum number of results
-            
-        Returns:
-            List of matching Patient objects
-        """
-        try:
-            # Case-insensitive search with regex
-            query = {'name': {'$regex': name, '$options': 'i'}}
-            results = await self.get_all(query, limit=limit)
-            return [Patient.from_dict(r) for r in results]
-        except Exception as e:
-            self.logger.error(f"Error searching patients by name: {str(e)}")
-            raise
-    
-    async def get_by_village(self, village: str, limit: int = 50) -> List[Patient]:
-        """Get patients from a specific village.
-        
-        Args:
-            village: The village name
-            limit: Maximum number of results
-            
-        Returns:
-            List of matching Patient objects
-        """
-        try:
-            query = {'village': village, 'active': True}
-            results = await self.get_all(query, limit=limit)
-            return [Patient.from_dict(r) for r in results]
-        except Exception as e:
-            self.logger.error(f"Error getting patients by village: {str(e)}")
-            raise
-    
-    async def create_patient(self, patient: Patient) -> str:
-        """Create a new patient record.
-        
-        Args:
-            patient: The Patient object to create
-            
-        Returns:
-            The patient_id of the created patient
-        """
-        return await self.create(patient)
-    
-    async def update_patient(self, patient: Patient) -> bool:
-        """Update an existing patient record.
-        
-        Args:
-            patient: The Patient object with updated data
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        patient.updated_at = datetime.now()
-        return await self.update('patient_id', patient.patient_id, patient.to_dict())
-    
-    async def deactivate_patient(self, patient_id: str) -> bool:
-        """Deactivate a patient record (soft delete).
-        
-        Args:
-            patient_id: The patient's unique ID
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        return await self.update('patient_id', patient_id, {'active': False, 'updated_at': datetime.now()})
-
-
-class HealthAssessmentRepository(Repository[HealthAssessment]):
-    """Repository for HealthAssessment data access operations."""
-    
-    def __init__(self, db):
-        """Initialize the HealthAssessment repository.
-        
-        Args:
-            db: Database connection instance
-        """
-        super().__init__(db, 'health_assessments')
-    
-    async def get_by_assessment_id(self, assessment_id: str) -> Optional[HealthAssessment]:
-        """Get an assessment by its assessment_id.
-        
-        Args:
-            assessment_id: The assessment's unique ID
-            
-        Returns:
-            HealthAssessment object if found, None otherwise
-        """
-        result = await self.get_by_id('assessment_id', assessment_id)
-        if result:
-            return HealthAssessment.from_dict(result)
-        return None
-    
-    async def get_by_patient_id(self, patient_id: str, limit: int = 20) -> List[HealthAssessment]:
-        """Get assessments for a specific patient.
-        
-        Args:
-            patient_id: The patient's unique ID
-            limit: Maximum number of results
-            
-        Returns:
-            List of HealthAssessment objects
-        """
-        try:
-            query = {'patient_id': patient_id}
-            results = await self.get_all(query, limit=limit)
-            return [HealthAssessment.from_dict(r) for r in results]
-        except Exception as e:
-            self.logger.error(f"Error getting assessments by patient ID: {str(e)}")
-            raise
-    
-    async def get_unsynced_assessments(self, limit: int = 50) -> List[HealthAssessment]:
-        """Get assessments that haven't been synced yet.
-        
-        Args:
-            limit: Maximum number of results
-            
-        Returns:
-            List of unsynced HealthAssessment objects
-        """
-        try:
-            query = {'synced': False}
-            results = await self.get_all(query, limit=limit)
-            return [HealthAssessment.from_dict(r) for r in results]
-        except Exception as e:
-            self.logger.error(f"Error getting unsynced assessments: {str(e)}")
-            raise
-    
-    async def create_assessment(self, assessment: HealthAssessment) -> str:
-        """Create a new health assessment record.
-        
-        Args:
-            assessment: The HealthAssessment object to create
-            
-        Returns:
-            The assessment_id of the created assessment
-        """
-        return await self.create(assessment)
-    
-    async def update_assessment(self, assessment: HealthAssessment) -> bool:
-        """Update an existing health assessment record.
-        
-        Args:
-            assessment: The HealthAssessment object with updated data
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        return await self.update('assessment_id', assessment.assessment_id, assessment.to_dict())
-    
-    async def mark_as_synced(self, assessment_id: str) -> bool:
-        """Mark an assessment as synced to the central database.
-        
-        Args:
-            assessment_id: The assessment's unique ID
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        return await self.update('assessment_id', assessment_id, {'synced': True})
-
-
-class UserRepository(Repository[User]):
-    """Repository for User data access operations."""
-    
-    def __init__(self, db):
-        """Initialize the User repository.
-        
-        Args:
-            db: Database connection instance
-        """
-        super().__init__(db, 'users')
-    
-    async def get_by_user_id(self, user_id: str) -> Optional[User]:
-        """Get a user by their user_id.
-        
-        Args:
-            user_id: The user's unique ID
-            
-        Returns:
-            User object if found, None otherwise
-        """
-        result = await self.get_by_id('user_id', user_id)
-        if result:
-            return User.from_dict(result)
-        return None
-    
-    async def get_by_username(self, username: str) -> Optional[User]:
-        """Get a user by their username.
-        
-        Args:
-            username: The user's username
-            
-        Returns:
-            User object if found, None otherwise
-        """
-        try:
-            query = {'username': username, 'active': True}
-            result = await self.db.find_one(self.collection_name, query)
-            if result:
-                return User.from_dict(result)
-            return None
-        except Exception as e:
-            self.logger.error(f"Error getting user by username: {str(e)}")
-            raise
-    
-    async def get_by_role(self, role: str, limit: int = 50) -> List[User]:
-        """Get users with a specific role.
-        
-        Args:
-            role: The role to filter by
-            limit: Maximum number of results
-            
-        Returns:
-            List of User objects with the specified role
-        """
-        try:
-            query = {'role': role, 'active': True}
-            results = await self.get_all(query, limit=limit)
-            return [User.from_dict(r) for r in results]
-        except Exception as e:
-            self.logger.error(f"Error getting users by role: {str(e)}")
-            raise
-    
-    async def create_user(self, user: User) -> str:
-        """Create a new user record.
-        
-        Args:
-            user: The User object to create
-            
-        Returns:
-            The user_id of the created user
-        """
-        return await self.create(user)
-    
-    async def update_user(self, user: User) -> bool:
-        """Update an existing user record.
-        
-        Args:
-            user: The User object with updated data
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        return await self.update('user_id', user.user_id, user.to_dict())
-    
-    async def update_last_login(self, user_id: str) -> bool:
-        """Update the last_login timestamp for a user.
-        
-        Args:
-            user_id: The user's unique ID
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        return await self.update('user_id', user_id, {'last_login': datetime.now()})
-    
-    async def deactivate_user(self, user_id: str) -> bool:
-        """Deactivate a user account (soft delete).
-        
-        Args:
-            user_id: The user's unique ID
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        return await self.update('user_id', user_id, {'active': False})
-
-
-class SyncRepository(Repository[SyncRecord]):
-    """Repository for SyncRecord data access operations."""
-    
-    def __init__(self, db):
-        """Initialize the SyncRecord repository.
-        
-        Args:
-            db: Database connection instance
-        """
-        super().__init__(db, 'sync_records')
-    
-    async def get_by_sync_id(self, sync_id: str) -> Optional[SyncRecord]:
-        """Get a sync record by its sync_id.
-        
-        Args:
-            sync_id: The sync record's unique ID
-            
-        Returns:
-            SyncRecord object if found, None otherwise
-        """
-        result = await self.get_by_id('sync_id', sync_id)
-        if result:
-            return SyncRecord.from_dict(result)
-        return None
-    
-    async def get_pending_records(self, limit: int = 50) -> List[SyncRecord]:
-        """Get pending sync records ordered by priority.
-        
-        Args:
-            limit: Maximum number of results
-            
-        Returns:
-            List of pending SyncRecord objects
-        """
-        try:
-            query = {'sync_status': 'pending'}
-            # Sort by priority (descending) and created_at (ascending)
-            sort = [('priority', -1), ('created_at', 1)]
-            results = await self.db.find(self.collection_name, query, limit=limit, sort=sort)
-            return [SyncRecord.from_dict(r) for r in results]
-        except Exception as e:
-            self.logger.error(f"Error getting pending sync records: {str(e)}")
-            raise
-    
-    async def get_failed_records(self, limit: int = 50) -> List[SyncRecord]:
-        """Get failed sync records.
-        
-        Args:
-            limit: Maximum number of results
-            
-        Returns:
-            List of failed SyncRecord objects
-        """
-        try:
-            query = {'sync_status': 'failed'}
-            results = await self.get_all(query, limit=limit)
-            return [SyncRecord.from_dict(r) for r in results]
-        except Exception as e:
-            self.logger.error(f"Error getting failed sync records: {str(e)}")
-            raise
-    
-    async def create_sync_record(self, record: SyncRecord) -> str:
-        """Create a new sync record.
-        
-        Args:
-            record: The SyncRecord object to create
-            
-        Returns:
-            The sync_id of the created record
-        """
-        return await self.create(record)
-    
-    async def mark_as_synced(self, sync_id: str) -> bool:
-        """Mark a sync record as successfully synced.
-        
-        Args:
-            sync_id: The sync record's unique ID
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        update_data = {
-            'sync_status': 'synced',
-            'synced_at': datetime.now()
-        }
-        return await self.update('sync_id', sync_id, update_data)
-    
-    async def mark_as_failed(self, sync_id: str, error_message: str) -> bool:
-        """Mark a sync record as failed with error message.
-        
-        Args:
-            sync_id: The sync record's unique ID
-            error_message: The error message
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            # Get current record to increment retry count
-            record = await self.get_by_sync_id(sync_id)
-            if not record:
-                return False
-                
-            update_data = {
-                'sync_status': 'failed',
-                'retry_count': record.retry_count + 1,
-                'error_message': error_message
-            }
-            return await self.update('sync_id', sync_id, update_data)
-        except Exception as e:
-            self.logger.error(f"Error marking sync record as failed: {str(e)}")
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Repository Module for ASHA Connect
+
+This module provides repository classes for data access operations including:
+- CRUD operations for all data models
+- Query functionality with filtering
+- Support for both online and offline data access
+
+These repositories abstract the database implementation details from the service layer.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from functools import lru_cache, wraps
+from typing import Dict, List, Optional, Any, Union, TypeVar, Generic
+
+from cachetools import TTLCache
+
+# BSON regex values skip the per-query recompilation PyMongo performs
+# on plain pattern strings; fall back to the string form without it
+try:
+    from bson.regex import Regex
+except ImportError:
+    Regex = None
+
+# Import models
+from data.models import Patient, HealthAssessment, User, SyncRecord
+
+
+def _now_us() -> int:
+    """Current time as integer epoch microseconds, matching the
+    timestamp representation used by the models and the database layer."""
+    return time.time_ns() // 1000
+
+
+@lru_cache(maxsize=256)
+def _build_name_regex(name: str):
+    """Build the anchored, escaped name pattern for prefix search.
+
+    Search terms repeat heavily within a session (incremental typing,
+    back navigation), so the constructed BSON Regex is memoized. The
+    strength-2 collation on the name index supplies case-insensitivity,
+    hence no 'i' flag.
+
+    Args:
+        name: Raw search term
+
+    Returns:
+        bson Regex (or plain pattern string when bson is unavailable)
+    """
+    pattern = '^' + re.escape(name)
+    return Regex(pattern, 0) if Regex is not None else pattern
+
+# Type variable for generic repository
+T = TypeVar('T')
+
+
+def _log_errors(operation: str):
+    """Log and re-raise exceptions from a repository coroutine.
+
+    The hot single-record methods used to carry an inline
+    try/except/log/raise block each; this installs the identical
+    behavior once as a decorator so their bodies stay free of
+    per-call exception-table setup.
+
+    Args:
+        operation: Verb phrase for the log line, e.g. 'getting'
+
+    Returns:
+        Decorator wrapping the coroutine
+    """
+    def decorator(method):
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            except Exception as e:
+                self.logger.error(
+                    f"Error {operation} {self.collection_name}: {str(e)}"
+                )
+                raise
+        return wrapper
+    return decorator
+
+class Repository(Generic[T]):
+    """Generic repository for data access operations."""
+    
+    def __init__(self, db, collection_name: str, model_class=None):
+        """Initialize the repository with database connection.
+
+        Args:
+            db: Database connection instance
+            collection_name: Name of the collection/table
+            model_class: Optional model class used to hydrate raw
+                documents (must provide from_dict)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db = db
+        self.collection_name = collection_name
+        self.model_class = model_class
+
+        # ID lookups repeat many times within one assessment session
+        # (UI renders, audit logs, sync record creation), so recent
+        # results are held for a short TTL. Sized from the environment
+        # so RAM-starved field devices can tune it down.
+        self._id_cache = TTLCache(
+            maxsize=int(os.getenv('REPO_ID_CACHE_SIZE', 2048)),
+            ttl=int(os.getenv('REPO_ID_CACHE_TTL', 30))
+        )
+        self._id_cache_lock = asyncio.Lock()
+    
+    async def create(self, item: T) -> str:
+        """Create a new record in the database.
+        
+        Args:
+            item: The item to create
+            
+        Returns:
+            The ID of the created item
+        """
+        try:
+            # Convert to dictionary if it has to_dict method
+            if hasattr(item, 'to_dict'):
+                data = item.to_dict()
+            else:
+                data = item
+                
+            # Insert into database
+            result = await self.db.insert_one(self.collection_name, data)
+            return result
+        except Exception as e:
+            self.logger.error(f"Error creating {self.collection_name}: {str(e)}")
+            raise
+    
+    async def create_many(self, items: List[T]) -> List[str]:
+        """Create a batch of records in one database round trip.
+
+        Sync drains that persist N outcomes should use this instead of
+        N create calls - the database layer sends one unordered bulk
+        insert, so per-operation framing and round-trip latency are
+        paid once for the whole batch.
+
+        Args:
+            items: The items to create
+
+        Returns:
+            List of IDs of the created items
+        """
+        try:
+            data = [i.to_dict() if hasattr(i, 'to_dict') else i for i in items]
+            result = await self.db.insert_many(self.collection_name, data)
+            return result.get('ids', [])
+        except Exception as e:
+            self.logger.error(f"Error batch-creating {self.collection_name}: {str(e)}")
+            raise
+
+    @_log_errors('getting')
+    async def get_by_id(self, id_field: str, id_value: str,
+                        model_cls=None) -> Optional[Any]:
+        """Get a record by its ID.
+
+        Args:
+            id_field: The field name that contains the ID
+            id_value: The ID value to search for
+            model_cls: Optional model class; when given, the raw dict is
+                hydrated straight into a slots instance so callers never
+                hold the string-keyed dict
+
+        Returns:
+            The record (hydrated when model_cls is given) if found,
+            None otherwise
+        """
+        cache_key = (id_field, id_value)
+        async with self._id_cache_lock:
+            cached = self._id_cache.get(cache_key)
+        if cached is None:
+            query = {id_field: id_value}
+            cached = await self.db.find_one(self.collection_name, query)
+            if cached is None:
+                return None
+            async with self._id_cache_lock:
+                self._id_cache[cache_key] = cached
+        if model_cls is not None:
+            return model_cls.from_dict(cached)
+        return cached
+    
+    async def get_by_ids(self, id_field: str, values: List[str],
+                         projection: Optional[Dict] = None) -> Dict[str, Dict]:
+        """Get a batch of records by their IDs in one query.
+
+        Callers resolving related records (assessments for a list of
+        patients) should use this instead of get_by_id in a loop - one
+        $in query replaces N round trips.
+
+        Args:
+            id_field: The field name that contains the ID
+            values: The ID values to fetch
+            projection: Optional fields to include in each document
+
+        Returns:
+            Dict mapping each found ID value to its record
+        """
+        try:
+            if not values:
+                return {}
+            query = {id_field: {'$in': list(values)}}
+            results = await self.db.find(
+                self.collection_name, query, limit=len(values),
+                projection=projection
+            )
+            return {r[id_field]: r for r in results}
+        except Exception as e:
+            self.logger.error(f"Error batch-getting {self.collection_name} by ID: {str(e)}")
+            raise
+
+    async def get_all(self, query: Optional[Dict] = None, limit: int = 100,
+                      after: Optional[Any] = None, skip: int = 0,
+                      sort: Optional[List] = None) -> List[Dict]:
+        """Get all records matching the query.
+
+        Pagination is keyset-based: pass the _id of the last record of
+        the previous page as `after` and each page becomes an index
+        range scan. The old `skip` argument still works but walks and
+        discards skip documents server-side, so its cost grows with
+        page depth - new callers should paginate with `after`.
+
+        Args:
+            query: Optional query filter
+            limit: Maximum number of records to return
+            after: _id of the last record of the previous page
+            skip: Number of records to skip (deprecated in favor of after)
+            sort: Optional sort specification; defaults to [('_id', 1)]
+                when paginating with after
+
+        Returns:
+            List of matching records
+        """
+        try:
+            query = dict(query) if query else {}
+            if after is not None:
+                query['_id'] = {'$gt': after}
+                if sort is None:
+                    sort = [('_id', 1)]
+            result = await self.db.find(
+                self.collection_name, query, limit=limit, skip=skip, sort=sort
+            )
+            return result
+        except Exception as e:
+            self.logger.error(f"Error getting all {self.collection_name}: {str(e)}")
+            raise
+    
+    async def iter_all(self, query: Optional[Dict] = None, batch_size: int = 200):
+        """Stream matching records as hydrated objects.
+
+        Pages through the collection batch_size rows at a time and
+        yields each object as soon as its source dict is decoded, so
+        only one batch of raw documents is alive at once - large scans
+        never hold the full dict list alongside the object list.
+
+        Args:
+            query: Optional query filter
+            batch_size: Number of records fetched per database call
+
+        Yields:
+            Hydrated model objects (raw dicts when no model_class is set)
+        """
+        hydrate = self.model_class.from_dict if self.model_class else None
+        after = None
+        while True:
+            batch = await self.get_all(query, limit=batch_size, after=after,
+                                       sort=[('_id', 1)])
+            if not batch:
+                return
+            for raw in batch:
+                yield hydrate(raw) if hydrate else raw
+            if len(batch) < batch_size:
+                return
+            after = batch[-1].get('_id')
+            if after is None:
+                return
+
+    @_log_errors('updating')
+    async def update(self, id_field: str, id_value: str, data: Dict) -> bool:
+        """Update a record by its ID.
+        
+        Args:
+            id_field: The field name that contains the ID
+            id_value: The ID value to update
+            data: The data to update
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        query = {id_field: id_value}
+        # A write makes the cached lookup for this ID stale
+        async with self._id_cache_lock:
+            self._id_cache.pop((id_field, id_value), None)
+        # The database layer stamps updated_at on every update, so
+        # no client-side timestamp is constructed here
+        result = await self.db.update_one(self.collection_name, query, {'$set': data})
+        return result
+    
+    async def update_and_fetch(self, id_field: str, id_value: str, data: Dict) -> Optional[Dict]:
+        """Update a record and return its new state in one round trip.
+
+        Write-then-read flows should prefer this over update followed
+        by get_by_id - the database resolves both in a single
+        find_one_and_update call.
+
+        Args:
+            id_field: The field name that contains the ID
+            id_value: The ID value to update
+            data: The data to update
+
+        Returns:
+            The post-update document, or None if no record matched
+        """
+        try:
+            query = {id_field: id_value}
+            async with self._id_cache_lock:
+                self._id_cache.pop((id_field, id_value), None)
+            result = await self.db.find_one_and_update(
+                self.collection_name, query, {'$set': data}
+            )
+            return result.get('document')
+        except Exception as e:
+            self.logger.error(f"Error updating {self.collection_name}: {str(e)}")
+            raise
+
+    @_log_errors('deleting')
+    async def delete(self, id_field: str, id_value: str) -> bool:
+        """Delete a record by its ID.
+        
+        Args:
+            id_field: The field name that contains the ID
+            id_value: The ID value to delete
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        async with self._id_cache_lock:
+            self._id_cache.pop((id_field, id_value), None)
+        query = {id_field: id_value}
+        result = await self.db.delete_one(self.collection_name, query)
+        return result
+    
+    @_log_errors('counting')
+    async def count(self, query: Optional[Dict] = None) -> int:
+        """Count records matching the query.
+        
+        Args:
+            query: Optional query filter
+            
+        Returns:
+            Number of matching records
+        """
+        result = await self.db.count(self.collection_name, query or {})
+        return result
+
+
+class PatientRepository(Repository[Patient]):
+    """Repository for Patient data access operations."""
+    
+    def __init__(self, db):
+        """Initialize the Patient repository.
+        
+        Args:
+            db: Database connection instance
+        """
+        super().__init__(db, 'patients', Patient)
+    
+    async def get_by_patient_id(self, patient_id: str) -> Optional[Patient]:
+        """Get a patient by their patient_id.
+        
+        Args:
+            patient_id: The patient's unique ID
+            
+        Returns:
+            Patient object if found, None otherwise
+        """
+        return await self.get_by_id('patient_id', patient_id, Patient)
+    
+    async def get_by_patient_ids(self, patient_ids: List[str]) -> Dict[str, Patient]:
+        """Get a batch of patients by their patient_ids in one query.
+
+        Args:
+            patient_ids: The patient IDs to fetch
+
+        Returns:
+            Dict mapping each found patient_id to its Patient object
+        """
+        results = await self.get_by_ids('patient_id', patient_ids)
+        return {pid: Patient.from_dict(r) for pid, r in results.items()}
+
+    async def get_by_name(self, name: str, limit: int = 10) -> List[Patient]:
+        """Search for patients by name (partial match).
+        
+        Args:
+            name: The name to search for
+            limit: Maximum number of results
+            
+        Returns:
+            List of matching Patient objects
+        """
+        try:
+            # Anchored prefix match so Mongo can answer from the name
+            # index instead of scanning the collection. The term is
+            # escaped before anchoring - regex syntax in the input is
+            # matched literally, which the warning below makes visible.
+            if re.escape(name) != name:
+                self.logger.warning(
+                    f"Patient name search term contains regex "
+                    f"metacharacters, matching literally: {name!r}"
+                )
+            query = {'name': _build_name_regex(name)}
+            results = await self.db.find(
+                self.collection_name, query, limit=limit,
+                collation={'locale': 'en', 'strength': 2}
+            )
+            return list(map(Patient.from_dict, results))
+        except Exception as e:
+            self.logger.error(f"Error searching patients by name: {str(e)}")
+            raise
+    
+    async def get_by_village(self, village: str, limit: int = 50,
+                             summary: bool = True) -> List[Patient]:
+        """Get patients from a specific village.
+
+        Args:
+            village: The village name
+            limit: Maximum number of results
+            summary: When True (the default) fetch only the fields the
+                patient list renders, leaving embedded history off the
+                wire; pass False for fully populated records
+
+        Returns:
+            List of matching Patient objects
+        """
+        try:
+            query = {'village': village, 'active': True}
+            projection = Patient.SUMMARY_PROJECTION if summary else None
+            results = await self.db.find(
+                self.collection_name, query, limit=limit, projection=projection
+            )
+            return list(map(Patient.from_dict, results))
+        except Exception as e:
+            self.logger.error(f"Error getting patients by village: {str(e)}")
+            raise
+    
+    async def create_patient(self, patient: Patient) -> str:
+        """Create a new patient record.
+        
+        Args:
+            patient: The Patient object to create
+            
+        Returns:
+            The patient_id of the created patient
+        """
+        return await self.create(patient)
+    
+    async def update_patient(self, patient: Patient) -> Optional[Patient]:
+        """Update an existing patient record and return its new state.
+
+        Args:
+            patient: The Patient object with updated data
+
+        Returns:
+            The updated Patient as stored, or None if no record matched
+        """
+        patient.updated_at = _now_us()
+        result = await self.update_and_fetch(
+            'patient_id', patient.patient_id, patient.to_dict()
+        )
+        if result:
+            return Patient.from_dict(result)
+        return None
+    
+    async def deactivate_patient(self, patient_id: str) -> bool:
+        """Deactivate a patient record (soft delete).
+        
+        Args:
+            patient_id: The patient's unique ID
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self.update('patient_id', patient_id, {'active': False})
+
+
+class HealthAssessmentRepository(Repository[HealthAssessment]):
+    """Repository for HealthAssessment data access operations."""
+    
+    def __init__(self, db):
+        """Initialize the HealthAssessment repository.
+        
+        Args:
+            db: Database connection instance
+        """
+        super().__init__(db, 'health_assessments', HealthAssessment)
+    
+    async def get_by_assessment_id(self, assessment_id: str) -> Optional[HealthAssessment]:
+        """Get an assessment by its assessment_id.
+        
+        Args:
+            assessment_id: The assessment's unique ID
+            
+        Returns:
+            HealthAssessment object if found, None otherwise
+        """
+        return await self.get_by_id('assessment_id', assessment_id, HealthAssessment)
+    
+    async def get_by_patient_id(self, patient_id: str, limit: int = 20) -> List[HealthAssessment]:
+        """Get assessments for a specific patient.
+        
+        Args:
+            patient_id: The patient's unique ID
+            limit: Maximum number of results
+            
+        Returns:
+            List of HealthAssessment objects
+        """
+        try:
+            query = {'patient_id': patient_id}
+            results = await self.get_all(query, limit=limit)
+            return list(map(HealthAssessment.from_dict, results))
+        except Exception as e:
+            self.logger.error(f"Error getting assessments by patient ID: {str(e)}")
+            raise
+    
+    async def get_unsynced_assessments(self, limit: int = 50) -> List[HealthAssessment]:
+        """Get assessments that haven't been synced yet.
+        
+        Args:
+            limit: Maximum number of results
+            
+        Returns:
+            List of unsynced HealthAssessment objects
+        """
+        try:
+            query = {'synced': False}
+            results = await self.get_all(query, limit=limit)
+            return list(map(HealthAssessment.from_dict, results))
+        except Exception as e:
+            self.logger.error(f"Error getting unsynced assessments: {str(e)}")
+            raise
+    
+    async def create_assessment(self, assessment: HealthAssessment) -> str:
+        """Create a new health assessment record.
+        
+        Args:
+            assessment: The HealthAssessment object to create
+            
+        Returns:
+            The assessment_id of the created assessment
+        """
+        return await self.create(assessment)
+
+    async def create_assessments(self, assessments: List[HealthAssessment]) -> List[str]:
+        """Create a batch of health assessment records in one round trip.
+
+        Args:
+            assessments: The HealthAssessment objects to create
+
+        Returns:
+            List of IDs of the created assessments
+        """
+        return await self.create_many(assessments)
+
+    async def update_assessment(self, assessment: HealthAssessment) -> bool:
+        """Update an existing health assessment record.
+        
+        Args:
+            assessment: The HealthAssessment object with updated data
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self.update('assessment_id', assessment.assessment_id, assessment.to_dict())
+    
+    async def mark_as_synced(self, assessment_id: str) -> bool:
+        """Mark an assessment as synced to the central database.
+        
+        Args:
+            assessment_id: The assessment's unique ID
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self.update('assessment_id', assessment_id, {'synced': True})
+
+
+class UserRepository(Repository[User]):
+    """Repository for User data access operations."""
+    
+    def __init__(self, db):
+        """Initialize the User repository.
+        
+        Args:
+            db: Database connection instance
+        """
+        super().__init__(db, 'users', User)
+    
+    async def get_by_user_id(self, user_id: str) -> Optional[User]:
+        """Get a user by their user_id.
+        
+        Args:
+            user_id: The user's unique ID
+            
+        Returns:
+            User object if found, None otherwise
+        """
+        return await self.get_by_id('user_id', user_id, User)
+    
+    async def get_by_user_ids(self, user_ids: List[str]) -> Dict[str, User]:
+        """Get a batch of users by their user_ids in one query.
+
+        Args:
+            user_ids: The user IDs to fetch
+
+        Returns:
+            Dict mapping each found user_id to its User object
+        """
+        results = await self.get_by_ids('user_id', user_ids)
+        return {uid: User.from_dict(r) for uid, r in results.items()}
+
+    async def get_by_username(self, username: str) -> Optional[User]:
+        """Get a user by their username.
+        
+        Args:
+            username: The user's username
+            
+        Returns:
+            User object if found, None otherwise
+        """
+        try:
+            query = {'username': username, 'active': True}
+            result = await self.db.find_one(self.collection_name, query)
+            if result:
+                return User.from_dict(result)
+            return None
+        except Exception as e:
+            self.logger.error(f"Error getting user by username: {str(e)}")
+            raise
+    
+    async def get_by_role(self, role: str, limit: int = 50,
+                          summary: bool = True) -> List[User]:
+        """Get users with a specific role.
+
+        Args:
+            role: The role to filter by
+            limit: Maximum number of results
+            summary: When True (the default) fetch only the fields the
+                user list renders; pass False for fully populated records
+
+        Returns:
+            List of User objects with the specified role
+        """
+        try:
+            query = {'role': role, 'active': True}
+            projection = User.SUMMARY_PROJECTION if summary else None
+            results = await self.db.find(
+                self.collection_name, query, limit=limit, projection=projection
+            )
+            return list(map(User.from_dict, results))
+        except Exception as e:
+            self.logger.error(f"Error getting users by role: {str(e)}")
+            raise
+    
+    async def create_user(self, user: User) -> str:
+        """Create a new user record.
+        
+        Args:
+            user: The User object to create
+            
+        Returns:
+            The user_id of the created user
+        """
+        return await self.create(user)
+    
+    async def update_user(self, user: User) -> bool:
+        """Update an existing user record.
+        
+        Args:
+            user: The User object with updated data
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self.update('user_id', user.user_id, user.to_dict())
+    
+    async def update_last_login(self, user_id: str) -> bool:
+        """Update the last_login timestamp for a user.
+        
+        Args:
+            user_id: The user's unique ID
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self.update('user_id', user_id, {'last_login': _now_us()})
+    
+    async def deactivate_user(self, user_id: str) -> bool:
+        """Deactivate a user account (soft delete).
+        
+        Args:
+            user_id: The user's unique ID
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self.update('user_id', user_id, {'active': False})
+
+
+class SyncRepository(Repository[SyncRecord]):
+    """Repository for SyncRecord data access operations."""
+    
+    def __init__(self, db):
+        """Initialize the SyncRecord repository.
+        
+        Args:
+            db: Database connection instance
+        """
+        super().__init__(db, 'sync_records', SyncRecord)
+    
+    async def get_by_sync_id(self, sync_id: str) -> Optional[SyncRecord]:
+        """Get a sync record by its sync_id.
+        
+        Args:
+            sync_id: The sync record's unique ID
+            
+        Returns:
+            SyncRecord object if found, None otherwise
+        """
+        return await self.get_by_id('sync_id', sync_id, SyncRecord)
+    
+    async def get_pending_records(self, limit: int = 50,
+                                  after: Optional[Dict] = None) -> List[SyncRecord]:
+        """Get pending sync records ordered by priority.
+
+        Args:
+            limit: Maximum number of results
+            after: Optional cursor - the last record of the previous
+                page as a dict with priority, created_at and _id. Each
+                page then resumes as a range scan on the
+                (sync_status, priority, created_at) index instead of
+                re-walking already-drained entries.
+
+        Returns:
+            List of pending SyncRecord objects
+        """
+        try:
+            query = {'sync_status': 'pending'}
+            if after is not None:
+                # Keyset condition matching the (priority desc,
+                # created_at asc, _id asc) sort order. The _id tiebreak
+                # matters because bulk_create stamps a whole batch with
+                # one clock read, so equal (priority, created_at) pairs
+                # are the common case - without it those rows would be
+                # skipped between pages.
+                query['$or'] = [
+                    {'priority': {'$lt': after['priority']}},
+                    {'priority': after['priority'],
+                     'created_at': {'$gt': after['created_at']}},
+                    {'priority': after['priority'],
+                     'created_at': after['created_at'],
+                     '_id': {'$gt': after['_id']}}
+                ]
+            # Sort by priority (descending), created_at (ascending) and
+            # _id as the unique tiebreak - the (sync_status, priority,
+            # created_at) index returns rows already in prefix order.
+            # The projection keeps only the fields the sync worker
+            # reads, dropping user_id/synced_at/error_message from
+            # every wire document; _id stays so callers can form the
+            # next page's cursor.
+            sort = [('priority', -1), ('created_at', 1), ('_id', 1)]
+            projection = {
+                'sync_id': 1, 'record_type': 1, 'record_id': 1, 'data': 1,
+                'priority': 1, 'retry_count': 1, 'created_at': 1,
+                'sync_status': 1, '_id': 1
+            }
+            results = await self.db.find(
+                self.collection_name, query, limit=limit, sort=sort,
+                projection=projection
+            )
+            return list(map(SyncRecord.from_dict, results))
+        except Exception as e:
+            self.logger.error(f"Error getting pending sync records: {str(e)}")
+            raise
+    
+    async def get_failed_records(self, limit: int = 50) -> List[SyncRecord]:
+        """Get failed sync records.
+        
+        Args:
+            limit: Maximum number of results
+            
+        Returns:
+            List of failed SyncRecord objects
+        """
+        try:
+            query = {'sync_status': 'failed'}
+            results = await self.get_all(query, limit=limit)
+            return list(map(SyncRecord.from_dict, results))
+        except Exception as e:
+            self.logger.error(f"Error getting failed sync records: {str(e)}")
+            raise
+    
+    async def create_sync_record(self, record: SyncRecord) -> str:
+        """Create a new sync record.
+        
+        Args:
+            record: The SyncRecord object to create
+            
+        Returns:
+            The sync_id of the created record
+        """
+        return await self.create(record)
+
+    async def create_sync_records(self, records: List[SyncRecord]) -> List[str]:
+        """Create a batch of sync records in one round trip.
+
+        Sync IDs are freshly generated, so the batch needs no
+        duplicate-key pre-checks before the bulk insert.
+
+        Args:
+            records: The SyncRecord objects to create
+
+        Returns:
+            List of IDs of the created records
+        """
+        return await self.create_many(records)
+
+    async def mark_as_synced(self, sync_id: str) -> bool:
+        """Mark a sync record as successfully synced.
+        
+        Args:
+            sync_id: The sync record's unique ID
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        update_data = {
+            'sync_status': 'synced',
+            'synced_at': _now_us()
+        }
+        return await self.update('sync_id', sync_id, update_data)
+    
+    async def mark_many_as_synced(self, sync_ids: List[str]) -> int:
+        """Mark a batch of sync records as synced in one bulk write.
+
+        The sync worker resolves whole batches at a time; this issues
+        one unordered bulk update instead of a round trip per record.
+
+        Args:
+            sync_ids: The sync record IDs to mark
+
+        Returns:
+            Number of records modified
+        """
+        try:
+            if not sync_ids:
+                return 0
+            now = _now_us()
+            updates = [
+                ({'sync_id': sync_id},
+                 {'$set': {'sync_status': 'synced', 'synced_at': now}})
+                for sync_id in sync_ids
+            ]
+            async with self._id_cache_lock:
+                for sync_id in sync_ids:
+                    self._id_cache.pop(('sync_id', sync_id), None)
+            result = await self.db.update_many(self.collection_name, updates)
+            return result.get('modified_count', 0)
+        except Exception as e:
+            self.logger.error(f"Error bulk-marking sync records as synced: {str(e)}")
+            raise
+
+    async def mark_many_as_failed(self, items: List[tuple]) -> int:
+        """Mark a batch of sync records as failed in one bulk write.
+
+        Args:
+            items: (sync_id, error_message) pairs
+
+        Returns:
+            Number of records modified
+        """
+        try:
+            if not items:
+                return 0
+            updates = [
+                ({'sync_id': sync_id},
+                 {'$inc': {'retry_count': 1},
+                  '$set': {'sync_status': 'failed',
+                           'error_message': error_message}})
+                for sync_id, error_message in items
+            ]
+            async with self._id_cache_lock:
+                for sync_id, _ in items:
+                    self._id_cache.pop(('sync_id', sync_id), None)
+            result = await self.db.update_many(self.collection_name, updates)
+            return result.get('modified_count', 0)
+        except Exception as e:
+            self.logger.error(f"Error bulk-marking sync records as failed: {str(e)}")
+            raise
+
+    async def mark_as_failed(self, sync_id: str, error_message: str) -> bool:
+        """Mark a sync record as failed with error message.
+        
+        Args:
+            sync_id: The sync record's unique ID
+            error_message: The error message
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            # One atomic update: $inc bumps retry_count server-side, so
+            # there is no read round-trip and concurrent failures cannot
+            # undercount retries
+            update_doc = {
+                '$inc': {'retry_count': 1},
+                '$set': {
+                    'sync_status': 'failed',
+                    'error_message': error_message
+                }
+            }
+            async with self._id_cache_lock:
+                self._id_cache.pop(('sync_id', sync_id), None)
+            result = await self.db.update_one(
+                self.collection_name, {'sync_id': sync_id}, update_doc
+            )
+            return result.get('modified_count', 0) > 0
+        except Exception as e:
+            self.logger.error(f"Error marking sync record as failed: {str(e)}")
             raise
\ No newline at end of file
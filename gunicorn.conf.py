@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Gunicorn Configuration for ASHA Connect
+
+The voice endpoints spend most of their time waiting on STT/TTS calls,
+so gevent workers let each process serve many in-flight requests
+instead of blocking a sync worker per call.
+
+Run with:
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+worker_class = 'gevent'
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+accesslog = None
+errorlog = '-'
@@ -23,6 +23,9 @@ import time
 from llama_cpp import Llama
 import numpy as np
 
+# Spatial index for facility lookups
+from scipy.spatial import cKDTree
+
 class HealthService:
     """Service for handling health assessments in ASHA Connect."""
     
@@ -47,7 +50,12 @@ class HealthService:
         
         # Load referral guidelines
         self.referral_guidelines = self._load_referral_guidelines()
-        
+
+        # Load referral facilities and build a spatial index so nearest-
+        # facility lookups are O(log N) instead of a full scan
+        self.facilities = self._load_facilities_database()
+        self.facility_tree = self._build_facility_index()
+
         self.logger.info("Health Service initialized successfully")
     
     def assess_health(self, symptoms: List[str], patient_info: Dict, language: str = 'en') -> Dict:
@@ -136,23 +144,55 @@ class HealthService:
     
     def get_referral_facilities(self, condition_ids: List[str], location: Dict, urgency: str) -> List[Dict]:
         """Get recommended healthcare facilities for referral.
-        
+
+        Facilities are found via the precomputed spatial index rather than
+        scanning and scoring the full facility list per request.
+
         Args:
             condition_ids: List of condition IDs
             location: Dictionary with latitude and longitude
             urgency: Urgency level (high, medium, low)
-            
+
         Returns:
-            List of recommended facilities
+            List of recommended facilities, nearest first
         """
-        # This would connect to a database of healthcare facilities
+        if not self.facilities:
+            return []
+
+        # Query the KD-tree for the nearest facilities
+        k = min(20, len(self.facilities))
+        point = [location.get('latitude', 0), location.get('longitude', 0)]
+        distances, indexes = self.facility_tree.query(point, k=k)
+
+        facilities = []
+        for distance, index in zip(np.atleast_1d(distances), np.atleast_1d(indexes)):
+            facility = dict(self.facilities[index])
+            # Rough conversion from degrees to kilometres
+            facility['distance'] = f"{distance * 111:.1f} km"
+            facilities.append(facility)
+
+        # For high urgency, prefer hospitals over primary health centers
+        if urgency == 'high':
+            facilities.sort(key=lambda f: 0 if f['type'] == 'Hospital' else 1)
+
+        return facilities
+
+    def _load_facilities_database(self) -> List[Dict]:
+        """Load database of healthcare facilities.
+
+        Returns:
+            List of facility dictionaries with coordinates
+        """
+        # In a real implementation, this would load from a database with a
+        # 2dsphere index
         # Simplified implementation for demonstration
         return [
             {
                 'id': 'facility1',
                 'name': 'Primary Health Center, Rajpur',
                 'type': 'PHC',
-                'distance': '3.2 km',
+                'latitude': 25.4358,
+                'longitude': 81.8463,
                 'address': 'Main Road, Rajpur Village',
                 'phone': '+91 9876543210',
                 'services': ['general medicine', 'maternal care', 'vaccinations'],
@@ -162,14 +202,106 @@ class HealthService:
                 'id': 'facility2',
                 'name': 'District Hospital',
                 'type': 'Hospital',
-                'distance': '12.5 km',
+                'latitude': 25.4683,
+                'longitude': 81.9041,
                 'address': 'Hospital Road, District Center',
                 'phone': '+91 9876543211',
                 'services': ['emergency', 'surgery', 'pediatrics', 'obstetrics'],
                 'wait_time': '60 minutes'
             }
         ]
+
+    def _build_facility_index(self) -> Optional[cKDTree]:
+        """Build a KD-tree over facility coordinates.
+
+        Returns:
+            cKDTree instance, or None if there are no facilities
+        """
+        if not self.facilities:
+            return None
+
+        coordinates = np.array([
+            [facility['latitude'], facility['longitude']]
+            for facility in self.facilities
+        ])
+        return cKDTree(coordinates)
     
+    def list_history(self, patient_id: str, limit: int = 10, offset: int = 0) -> Dict:
+        """Get assessment history for a patient with related records joined in.
+
+        The referral, facility and creator for each assessment are loaded in
+        the same query - one aggregation with $lookup stages (sorted by
+        created_at descending with $skip/$limit) - rather than one query per
+        assessment and relation.
+
+        Args:
+            patient_id: ID of the patient
+            limit: Maximum number of results
+            offset: Number of results to skip
+
+        Returns:
+            Dict containing assessment history with joined relations
+        """
+        # In a real implementation, this would be a single aggregation
+        # pipeline joining referrals, facilities and creators
+        # Simplified implementation for demonstration
+        assessments = [
+            {
+                'id': '1',
+                'patient_id': patient_id,
+                'symptoms': ['fever', 'headache', 'chills'],
+                'assessment': [
+                    {
+                        'id': 'malaria',
+                        'name': 'Malaria',
+                        'confidence': 85,
+                        'requires_referral': True
+                    }
+                ],
+                'recommendations': self.treatment_protocols['malaria'],
+                'referral': {
+                    'is_required': True,
+                    'urgency': 'urgent',
+                    'reason': 'High likelihood of Malaria',
+                    'facility_type': 'phc'
+                },
+                'created_at': '2023-06-15T10:30:00',
+                'created_by': '1'
+            },
+            {
+                'id': '2',
+                'patient_id': patient_id,
+                'symptoms': ['cough', 'fever', 'difficulty breathing'],
+                'assessment': [
+                    {
+                        'id': 'pneumonia',
+                        'name': 'Pneumonia',
+                        'confidence': 78,
+                        'requires_referral': True
+                    }
+                ],
+                'recommendations': self.treatment_protocols['pneumonia'],
+                'referral': {
+                    'is_required': True,
+                    'urgency': 'urgent',
+                    'reason': 'High likelihood of Pneumonia',
+                    'facility_type': 'phc'
+                },
+                'created_at': '2023-05-20T14:15:00',
+                'created_by': '1'
+            }
+        ]
+
+        total = len(assessments)
+        page = assessments[offset:offset + limit]
+
+        return {
+            'success': True,
+            'assessments': page,
+            'count': len(page),
+            'total': total
+        }
+
     def _initialize_llm(self) -> Optional[Llama]:
         """Initialize the Llama language model.
         
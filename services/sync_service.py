@@ -334,6 +334,115 @@ class SyncService:
                 'error': f"Failed to retry sync: {str(e)}"
             }
     
+    def create_job(self, job_id: str) -> Dict:
+        """Record a queued background sync job.
+
+        The row lives in the shared local database so any worker
+        process can answer a status poll, not just the one that
+        accepted the trigger. Finished jobs older than an hour are
+        pruned here so jobs whose clients never poll do not
+        accumulate.
+
+        Args:
+            job_id: Unique identifier for the job
+
+        Returns:
+            Dict containing operation result
+        """
+        try:
+            conn = sqlite3.connect(self.local_db_path)
+            cursor = conn.cursor()
+
+            cutoff = (datetime.now() - timedelta(hours=1)).isoformat()
+            cursor.execute(
+                "DELETE FROM sync_jobs WHERE status != 'running' AND created_at < ?",
+                (cutoff,)
+            )
+
+            cursor.execute(
+                "INSERT OR REPLACE INTO sync_jobs (job_id, status, created_at) "
+                "VALUES (?, 'running', ?)",
+                (job_id, datetime.now().isoformat())
+            )
+
+            conn.commit()
+            conn.close()
+
+            return {
+                'success': True,
+                'job_id': job_id
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error creating sync job: {str(e)}")
+            return {
+                'success': False,
+                'error': f"Failed to create sync job: {str(e)}"
+            }
+
+    def finish_job(self, job_id: str, result: Dict) -> None:
+        """Mark a background sync job as completed with its result.
+
+        Args:
+            job_id: Unique identifier for the job
+            result: The job's result payload
+        """
+        try:
+            conn = sqlite3.connect(self.local_db_path)
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "UPDATE sync_jobs SET status = 'completed', result = ?, "
+                "finished_at = ? WHERE job_id = ?",
+                (json.dumps(result), datetime.now().isoformat(), job_id)
+            )
+
+            conn.commit()
+            conn.close()
+
+        except Exception as e:
+            self.logger.error(f"Error finishing sync job: {str(e)}")
+
+    def get_job(self, job_id: str) -> Dict:
+        """Get the status of a background sync job.
+
+        Args:
+            job_id: Unique identifier for the job
+
+        Returns:
+            Dict with job status and, once completed, the stored result
+        """
+        try:
+            conn = sqlite3.connect(self.local_db_path)
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "SELECT status, result FROM sync_jobs WHERE job_id = ?",
+                (job_id,)
+            )
+            row = cursor.fetchone()
+            conn.close()
+
+            if row is None:
+                return {
+                    'success': False,
+                    'error': 'Job not found'
+                }
+
+            status, result = row
+            return {
+                'success': True,
+                'status': status,
+                'result': json.loads(result) if result else None
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error getting sync job: {str(e)}")
+            return {
+                'success': False,
+                'error': f"Failed to get sync job: {str(e)}"
+            }
+
     def _init_local_db(self) -> None:
         """Initialize the local SQLite database."""
         try:
@@ -360,7 +469,20 @@ class SyncService:
             
             # Create index on data_type for faster queries
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_data_type ON sync_data (data_type)")
-            
+
+            # Create sync_jobs table for background job tracking - kept
+            # in SQLite rather than process memory so every gunicorn
+            # worker sees the same job status
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sync_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    created_at TEXT NOT NULL,
+                    finished_at TEXT
+                )
+            """)
+
             conn.commit()
             conn.close()
             